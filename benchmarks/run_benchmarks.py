@@ -0,0 +1,184 @@
+"""
+Stage benchmarks on synthetic panels.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks --sizes small medium
+    python -m benchmarks.run_benchmarks --sizes small --save-baseline
+    python -m benchmarks.run_benchmarks --sizes small large --tolerance 0.25
+
+Every stage is timed (wall clock) and its peak traced memory recorded
+(tracemalloc: Python and NumPy/pandas allocations, not pyarrow's own
+pool). Results are compared against benchmarks/baseline.json; a stage
+slower than baseline * (1 + tolerance) is reported as a regression and
+the exit code is 1. Baselines are machine specific and not committed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.animated_map import build_dashboard
+from src.data_preparation import prepare_data
+from src.economic_analysis import (
+    analyze_global_trends,
+    compute_country_trends,
+    create_country_summary,
+    create_intermediate_dataset,
+)
+from src.synthetic import write_raw_panel
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# entities x years; rows = entities * years before cleaning
+SIZES = {
+    "tiny": (200, 16),
+    "small": (2_000, 30),
+    "medium": (20_000, 50),
+    "large": (100_000, 100),
+    "xlarge": (200_000, 50),
+}
+
+
+def _measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    result = func()
+
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {"seconds": round(seconds, 4), "peak_mb": round(peak / 2 ** 20, 2)}
+
+
+def run_size(size, work_dir, n_indicators=13):
+    """
+    Generates one synthetic raw panel and runs the analytics stages on it.
+    Returns {stage: {"seconds": ..., "peak_mb": ...}}.
+    """
+
+    n_entities, n_years = SIZES[size]
+    raw_path = os.path.join(work_dir, size, "raw.csv")
+
+    write_raw_panel(raw_path, n_entities=n_entities, n_years=n_years, n_indicators=n_indicators)
+
+    lookup_path = os.path.join(work_dir, "iso3_lookup.csv")
+    metrics = {}
+
+    cleaned, metrics["prepare_data"] = _measure(
+        lambda: prepare_data(raw_path, None, save_cleaned=False, iso3_lookup_path=lookup_path)
+    )
+    inter, metrics["create_intermediate_dataset"] = _measure(
+        lambda: create_intermediate_dataset(cleaned, None)
+    )
+    summary, metrics["create_country_summary"] = _measure(
+        lambda: create_country_summary(cleaned, None)
+    )
+    _, metrics["compute_country_trends"] = _measure(
+        lambda: compute_country_trends(inter, None)
+    )
+    global_df, metrics["analyze_global_trends"] = _measure(
+        lambda: analyze_global_trends(inter, None)
+    )
+    _, metrics["build_dashboard"] = _measure(
+        lambda: build_dashboard(
+            inter,
+            global_df,
+            summary,
+            output_html_path=os.path.join(work_dir, size, "docs", "index.html")
+        )
+    )
+
+    # rows that survive cleaning (critical NaNs are dropped), which is
+    # what every stage after prepare_data processes
+    for stage, values in metrics.items():
+        values["rows"] = len(cleaned)
+
+    return metrics
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns a list of (size, stage, seconds, baseline_seconds) regressions.
+    """
+
+    regressions = []
+    for size, stages in results.items():
+        for stage, values in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference and values["seconds"] > reference["seconds"] * (1 + tolerance):
+                regressions.append((size, stage, values["seconds"], reference["seconds"]))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline stage benchmarks on synthetic data")
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "small"], choices=list(SIZES))
+    parser.add_argument("--indicators", type=int, default=13)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            results[size] = run_size(size, work_dir, n_indicators=args.indicators)
+
+    print()
+    print(f"{'size':<8} {'stage':<30} {'rows':>10} {'seconds':>9} {'peak MB':>9}")
+    for size, stages in results.items():
+        for stage, values in stages.items():
+            print(f"{size:<8} {stage:<30} {values['rows']:>10} {values['seconds']:>9.3f} {values['peak_mb']:>9.1f}")
+
+    report = {
+        "machine": {"python": sys.version.split()[0], "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline first")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for size, stage, seconds, reference in regressions:
+        print(f"REGRESSION {size}/{stage}: {seconds:.3f}s vs baseline {reference:.3f}s")
+
+    if not regressions:
+        print(f"No regressions (tolerance {args.tolerance:.0%})")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
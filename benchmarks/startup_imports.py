@@ -0,0 +1,135 @@
+"""
+Startup import check.
+
+Usage (from the repository root):
+
+    python -m benchmarks.startup_imports
+    python -m benchmarks.startup_imports --run analyze
+
+Imports main.py in a fresh interpreter with `python -X importtime`,
+prints the slowest imports and fails (exit code 1) when a plotting
+library is loaded. With --run the given command is executed as well,
+in a temporary copy of main.py, src/ and the raw / reference data (the
+repository outputs are not touched), and the modules it imports are
+checked the same way. Only the "plot" and "dashboard" commands may
+import plotting libraries.
+
+The same check runs as a test in tests/test_startup_imports.py.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PLOTTING_PACKAGES = ["matplotlib", "plotly", "seaborn", "kaleido"]
+
+ANALYTICS_COMMANDS = ["prepare", "features", "analyze"]
+
+
+def copy_pipeline(target_dir):
+    """
+    Copies main.py, src/ and the raw / reference data to target_dir.
+    """
+
+    ignore = shutil.ignore_patterns("__pycache__")
+
+    shutil.copy(os.path.join(ROOT_DIR, "main.py"), target_dir)
+    shutil.copytree(os.path.join(ROOT_DIR, "src"), os.path.join(target_dir, "src"), ignore=ignore)
+    for name in ["raw", "reference"]:
+        shutil.copytree(
+            os.path.join(ROOT_DIR, "data", name),
+            os.path.join(target_dir, "data", name),
+            ignore=ignore
+        )
+
+
+def import_times(args, cwd=ROOT_DIR):
+    """
+    Runs `python -X importtime <args>` in cwd and returns
+    {module: (self_us, cumulative_us, top_level)} from its stderr report.
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr[-2000:])
+        raise RuntimeError(f"{' '.join(args)} exited with {process.returncode}")
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        top_level = module.startswith(" ") and not module.startswith("  ")
+        times[module.strip()] = (int(self_us), int(cumulative_us), top_level)
+
+    return times
+
+
+def plotting_modules(times):
+    return sorted(
+        module for module in times
+        if module.split(".")[0] in PLOTTING_PACKAGES
+    )
+
+
+def report(label, times, top):
+    """
+    Prints the import summary of one check; returns True when it
+    loaded a plotting library.
+    """
+
+    total = sum(cumulative_us for _, cumulative_us, top_level in times.values() if top_level)
+    print(f"{label}: {len(times)} modules imported in {total / 1e6:.3f}s")
+
+    slowest = sorted(times.items(), key=lambda item: item[1][1], reverse=True)
+    for module, (_, cumulative_us, _) in slowest[:top]:
+        print(f"  {cumulative_us / 1e6:>8.3f}s  {module}")
+
+    plotting = plotting_modules(times)
+    if plotting:
+        print(f"FAIL {label} imported plotting modules: {', '.join(plotting[:10])}")
+
+    return bool(plotting)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check which libraries the pipeline imports")
+    parser.add_argument("--run", choices=ANALYTICS_COMMANDS, help="also run this command")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports shown")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="startup_imports_")
+    copy_pipeline(work_dir)
+
+    checks = {"import main": ["-c", "import main; main.build_stages()"]}
+    if args.run:
+        checks[f"main.py {args.run}"] = ["main.py", args.run]
+
+    failed = False
+    try:
+        for label, command in checks.items():
+            failed |= report(label, import_times(command, cwd=work_dir), args.top)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not failed:
+        print("No plotting library imported")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import argparse
+import glob
 import os
 
 from src.data_preparation import prepare_data
@@ -7,15 +9,18 @@ from src.economic_analysis import (
     compute_country_trends,
     analyze_global_trends
 )
-from src.visualization import (
-    plot_country_gdp_trend,
-    plot_country_inflation_trend,
-    plot_global_inflation_trend,
-    plot_global_gdp_growth_trend,
-    plot_crisis_years_by_country,
-    plot_top_countries_by_avg_gdp
-)
-from src.animated_map import build_dashboard
+from src.country_codes import ISO3_OVERRIDES_PATH, add_iso3_column
+from src.correlations import CORRELATION_WINDOW, cache_correlations
+from src.crisis_episodes import compute_crisis_episodes
+from src.dense_panel import load_dense_panel, write_dense_panel
+from src.features import FEATURE_WINDOWS, create_feature_dataset
+from src.incremental import build_incremental_state, apply_incremental_update
+from src.io_utils import load_frame
+from src.panel import EconomicPanel
+from src.render_cache import RenderCache
+from src.render_pool import ChartJob, render_charts
+from src.stages import Stage, run_stages, with_dependencies
+from src.trend_slopes import compute_trend_slopes
 
 
 # -------------------------------------------------
@@ -27,8 +32,15 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
 
 RAW_DATA = os.path.join(DATA_DIR, "raw", "dataset.csv")
+RAW_APPENDED_DIR = os.path.join(DATA_DIR, "raw", "appended")
 CLEANED_DATA = os.path.join(DATA_DIR, "cleaned", "cleaned_data.csv")
 INTERMEDIATE_DATA = os.path.join(DATA_DIR, "intermediate", "intermediate_data.csv")
+CLEANED_PARQUET = os.path.join(DATA_DIR, "cleaned", "cleaned_data.parquet")
+INTERMEDIATE_PARQUET = os.path.join(DATA_DIR, "intermediate", "intermediate_data.parquet")
+INCREMENTAL_STATE = os.path.join(DATA_DIR, "intermediate", "incremental_state")
+DENSE_PANEL = os.path.join(DATA_DIR, "intermediate", "dense_panel")
+FEATURES_PARQUET = os.path.join(DATA_DIR, "intermediate", "features.parquet")
+CORRELATION_CACHE = os.path.join(DATA_DIR, "intermediate", "correlation_cache")
 
 CSV_DIR = os.path.join(OUTPUT_DIR, "csv")
 PNG_DIR = os.path.join(OUTPUT_DIR, "png")
@@ -36,6 +48,8 @@ PNG_DIR = os.path.join(OUTPUT_DIR, "png")
 COUNTRY_SUMMARY_CSV = os.path.join(CSV_DIR, "country_summary.csv")
 COUNTRY_TRENDS_CSV = os.path.join(CSV_DIR, "country_trends.csv")
 GLOBAL_TRENDS_CSV = os.path.join(CSV_DIR, "global_trends.csv")
+TREND_SLOPES_CSV = os.path.join(CSV_DIR, "trend_slopes.csv")
+CRISIS_EPISODES_CSV = os.path.join(CSV_DIR, "crisis_episodes.csv")
 
 PNG_GLOBAL_INFLATION = os.path.join(PNG_DIR, "global_inflation_trend.png")
 PNG_GLOBAL_GDP_GROWTH = os.path.join(PNG_DIR, "global_gdp_growth_trend.png")
@@ -43,75 +57,557 @@ PNG_TOP_COUNTRIES_GDP = os.path.join(PNG_DIR, "top_countries_avg_gdp.png")
 PNG_CRISIS_COUNTRIES = os.path.join(PNG_DIR, "crisis_years_by_country.png")
 PNG_COUNTRY_GDP = os.path.join(PNG_DIR, "country_gdp_trend_TR.png")
 PNG_COUNTRY_INFLATION = os.path.join(PNG_DIR, "country_inflation_trend_TR.png")
+PNG_COUNTRIES_DIR = os.path.join(PNG_DIR, "countries")
+
+DASHBOARD_HTML = os.path.join(BASE_DIR, "docs", "index.html")
+
+STAGE_STATE = os.path.join(OUTPUT_DIR, ".stage_fingerprints.json")
+RENDER_CACHE = os.path.join(OUTPUT_DIR, ".render_cache")
+
+LOG_DIR = os.path.join(OUTPUT_DIR, "logs")
+RUN_LOG = os.path.join(LOG_DIR, "run_log.jsonl")
+PROFILE_DIR = os.path.join(LOG_DIR, "profiles")
+
+
+# -------------------------------------------------
+# Pipeline parameters
+# -------------------------------------------------
+ROLLING_WINDOW = 5
+RECENT_YEARS = 5
+TOP_N = 10
+COUNTRY_ID = "tr"
+
+# parse multi-file raw inputs in a process pool instead of threads
+# (see src.data_preparation.read_raw_files)
+RAW_READ_PROCESSES = False
+
+# how docs/index.html loads plotly.js (see src.animated_map.build_dashboard)
+PLOTLYJS_MODES = ["directory", "inline", "cdn"]
+
+
+# -------------------------------------------------
+# Commands (stage groups)
+# -------------------------------------------------
+# Every command runs its stages plus whatever they depend on; stages
+# that are up to date are skipped as usual. Plotting libraries are only
+# imported by the stages of "plot" and "dashboard".
+COMMANDS = {
+    "prepare": ["prepare"],
+    "features": ["intermediate", "features", "dense_panel"],
+    "analyze": [
+        "country_summary",
+        "country_trends",
+        "trend_slopes",
+        "crisis_episodes",
+        "correlations",
+        "global_trends",
+        "incremental_state",
+    ],
+    "plot": ["charts", "country_charts"],
+    "dashboard": ["dashboard"],
+}
 
 
 # -------------------------------------------------
 # Main pipeline
 # -------------------------------------------------
-def main():
-    # --- Data preparation ---
-    prepare_data(RAW_DATA, CLEANED_DATA)
-
-    create_intermediate_dataset(
-        CLEANED_DATA,
-        INTERMEDIATE_DATA,
-        rolling_window=5
-    )
+def appended_raw_paths():
+    """
+    Raw rows added with --append (kept in data/raw/appended/, see
+    src.incremental), in the order they were appended.
+    """
 
-    create_country_summary(
-        CLEANED_DATA,
-        COUNTRY_SUMMARY_CSV
-    )
+    return sorted(glob.glob(os.path.join(RAW_APPENDED_DIR, "*.csv")))
 
-    compute_country_trends(
-        INTERMEDIATE_DATA,
-        COUNTRY_TRENDS_CSV
-    )
 
-    analyze_global_trends(
-        INTERMEDIATE_DATA,
-        GLOBAL_TRENDS_CSV
-    )
+def render_static_charts(
+    global_df,
+    summary_df,
+    trends_df,
+    intermediate_df,
+    top_n,
+    country_id,
+    force=False
+):
+    """
+    Renders the PNG charts in parallel. Each job receives only the
+    columns (and for the country charts, the rows) it draws; charts
+    whose slice and parameters are unchanged are not rendered again
+    (see src.render_cache) unless force is True.
+    """
 
-    # --- Static visualizations ---
-    plot_global_inflation_trend(
-        GLOBAL_TRENDS_CSV,
-        PNG_GLOBAL_INFLATION
+    from src.visualization import (
+        plot_country_gdp_trend,
+        plot_country_inflation_trend,
+        plot_global_inflation_trend,
+        plot_global_gdp_growth_trend,
+        plot_crisis_years_by_country,
+        plot_top_countries_by_avg_gdp
     )
 
-    plot_global_gdp_growth_trend(
-        GLOBAL_TRENDS_CSV,
-        PNG_GLOBAL_GDP_GROWTH
-    )
+    country_filter = [("Country_ID", "==", country_id)]
+    panel = EconomicPanel(intermediate_df)
+
+    jobs = [
+        ChartJob(
+            "global_inflation",
+            plot_global_inflation_trend,
+            global_df,
+            PNG_GLOBAL_INFLATION,
+            columns=["Year", "global_mean_inflation"]
+        ),
+        ChartJob(
+            "global_gdp_growth",
+            plot_global_gdp_growth_trend,
+            global_df,
+            PNG_GLOBAL_GDP_GROWTH,
+            columns=["Year", "mean_global_gdp_growth"]
+        ),
+        ChartJob(
+            "top_countries",
+            plot_top_countries_by_avg_gdp,
+            summary_df,
+            PNG_TOP_COUNTRIES_GDP,
+            kwargs={"top_n": top_n},
+            columns=["country_name", "avg_gdp"]
+        ),
+        ChartJob(
+            "crisis_years",
+            plot_crisis_years_by_country,
+            trends_df,
+            PNG_CRISIS_COUNTRIES,
+            kwargs={"top_n": top_n},
+            columns=["Country", "crisis_year_count"]
+        ),
+        ChartJob(
+            "country_gdp",
+            plot_country_gdp_trend,
+            panel,
+            PNG_COUNTRY_GDP,
+            kwargs={"country_id": country_id},
+            columns=["Country_ID", "Year", "GDP", "GDP_rolling_avg"],
+            filters=country_filter
+        ),
+        ChartJob(
+            "country_inflation",
+            plot_country_inflation_trend,
+            panel,
+            PNG_COUNTRY_INFLATION,
+            kwargs={"country_id": country_id},
+            columns=["Country_ID", "Year", "Inflation_CPI", "Inflation_rolling_avg"],
+            filters=country_filter
+        ),
+    ]
+
+    cache = RenderCache(RENDER_CACHE)
+    results = render_charts(jobs, cache=cache, force=force)
+    cache.save()
+
+    failed = [result["name"] for result in results if not result["ok"]]
+    if failed:
+        raise RuntimeError(f"Chart rendering failed for: {', '.join(failed)}")
+
+    return results
+
+
+def render_all_country_charts(intermediate_df, force=False):
+    """
+    Renders the GDP and inflation trend charts for every country whose
+    data changed since its chart was rendered (every country with
+    force=True).
+    """
+
+    from src.visualization import plot_country_trends_batch
+
+    workers = os.cpu_count() or 1
+    cache = RenderCache(RENDER_CACHE)
+
+    for kind in ["gdp", "inflation"]:
+        plot_country_trends_batch(
+            intermediate_df,
+            PNG_COUNTRIES_DIR,
+            kind=kind,
+            max_workers=workers,
+            cache=cache,
+            force=force
+        )
+
+    cache.save()
+
+
+def render_dashboard(intermediate_df, global_df, summary_df, country_id, plotlyjs, force=False):
+    """
+    Builds the interactive Plotly dashboard (skipped when the data it
+    shows is unchanged, see src.render_cache, unless force is True).
+    plotlyjs is one of PLOTLYJS_MODES.
+    """
+
+    from src.animated_map import build_dashboard
 
-    plot_top_countries_by_avg_gdp(
-        COUNTRY_SUMMARY_CSV,
-        PNG_TOP_COUNTRIES_GDP
+    cache = RenderCache(RENDER_CACHE)
+    sizes = build_dashboard(
+        intermediate_csv=intermediate_df,
+        global_trends_csv=global_df,
+        country_summary_csv=summary_df,
+        country_id=country_id,
+        output_html_path=DASHBOARD_HTML,
+        include_plotlyjs=plotlyjs,
+        cache=cache,
+        force=force
     )
+    cache.save()
 
-    plot_crisis_years_by_country(
-        COUNTRY_TRENDS_CSV,
-        PNG_CRISIS_COUNTRIES
+    return sizes
+
+
+def build_stages(save_csv=True, force=False, plotlyjs="directory"):
+    """
+    Declares the pipeline DAG. DataFrames are handed from one stage to
+    the next in memory; CSV artifacts are written as a side effect when
+    save_csv is True. CSV files are declared as outputs, and save_csv is
+    a parameter of the data preparation stages, so toggling it (or
+    deleting a CSV) re-runs the stages that write them. Stages without
+    outputs (e.g. save_csv=False) are never skipped. force=True also
+    bypasses the render cache of the chart and dashboard stages.
+    plotlyjs selects how the dashboard loads plotly.js (PLOTLYJS_MODES).
+
+    Plotting modules are referenced by name in `code`, so declaring the
+    stages does not import matplotlib or Plotly.
+    """
+
+    def csv_path(path):
+        return path if save_csv else None
+
+    def csv_outputs(path):
+        return [path] if save_csv else []
+
+    appended_paths = appended_raw_paths()
+
+    return [
+        # --- Data preparation ---
+        Stage(
+            "prepare",
+            lambda save_csv, use_processes: prepare_data(
+                RAW_DATA,
+                CLEANED_DATA,
+                save_cleaned=save_csv,
+                parquet_dir=CLEANED_PARQUET,
+                use_processes=use_processes,
+                appended_paths=appended_paths
+            ),
+            params={"save_csv": save_csv, "use_processes": RAW_READ_PROCESSES},
+            files=[RAW_DATA, ISO3_OVERRIDES_PATH] + appended_paths,
+            code=[prepare_data, add_iso3_column],
+            outputs=[CLEANED_PARQUET] + csv_outputs(CLEANED_DATA),
+            load=lambda: load_frame(CLEANED_PARQUET)
+        ),
+        Stage(
+            "intermediate",
+            lambda cleaned_df, rolling_window, save_csv: create_intermediate_dataset(
+                cleaned_df,
+                INTERMEDIATE_DATA if save_csv else None,
+                rolling_window=rolling_window,
+                parquet_dir=INTERMEDIATE_PARQUET
+            ),
+            deps=["prepare"],
+            params={"rolling_window": ROLLING_WINDOW, "save_csv": save_csv},
+            code=[create_intermediate_dataset],
+            outputs=[INTERMEDIATE_PARQUET] + csv_outputs(INTERMEDIATE_DATA),
+            load=lambda: load_frame(INTERMEDIATE_PARQUET)
+        ),
+        Stage(
+            "features",
+            lambda intermediate_df, windows: create_feature_dataset(
+                intermediate_df,
+                FEATURES_PARQUET,
+                windows=windows
+            ),
+            deps=["intermediate"],
+            params={"windows": list(FEATURE_WINDOWS)},
+            code=[create_feature_dataset],
+            outputs=[FEATURES_PARQUET],
+            load=lambda: load_frame(FEATURES_PARQUET)
+        ),
+        Stage(
+            "dense_panel",
+            lambda intermediate_df: write_dense_panel(intermediate_df, DENSE_PANEL),
+            deps=["intermediate"],
+            code=[write_dense_panel],
+            outputs=[DENSE_PANEL],
+            load=lambda: load_dense_panel(DENSE_PANEL)
+        ),
+        Stage(
+            "country_summary",
+            lambda cleaned_df: create_country_summary(
+                cleaned_df,
+                csv_path(COUNTRY_SUMMARY_CSV)
+            ),
+            deps=["prepare"],
+            code=[create_country_summary],
+            outputs=csv_outputs(COUNTRY_SUMMARY_CSV),
+            load=lambda: load_frame(COUNTRY_SUMMARY_CSV)
+        ),
+        Stage(
+            "country_trends",
+            lambda intermediate_df, recent_years: compute_country_trends(
+                intermediate_df,
+                csv_path(COUNTRY_TRENDS_CSV),
+                recent_years=recent_years
+            ),
+            deps=["intermediate"],
+            params={"recent_years": RECENT_YEARS},
+            code=[compute_country_trends],
+            outputs=csv_outputs(COUNTRY_TRENDS_CSV),
+            load=lambda: load_frame(COUNTRY_TRENDS_CSV)
+        ),
+        Stage(
+            "trend_slopes",
+            lambda intermediate_df: compute_trend_slopes(
+                intermediate_df,
+                csv_path(TREND_SLOPES_CSV)
+            ),
+            deps=["intermediate"],
+            code=[compute_trend_slopes],
+            outputs=csv_outputs(TREND_SLOPES_CSV)
+        ),
+        Stage(
+            "crisis_episodes",
+            lambda intermediate_df: compute_crisis_episodes(
+                intermediate_df,
+                csv_path(CRISIS_EPISODES_CSV)
+            ),
+            deps=["intermediate"],
+            code=[compute_crisis_episodes],
+            outputs=csv_outputs(CRISIS_EPISODES_CSV)
+        ),
+        Stage(
+            "correlations",
+            lambda intermediate_df, window: cache_correlations(
+                intermediate_df,
+                CORRELATION_CACHE,
+                window=window
+            ),
+            deps=["intermediate"],
+            params={"window": CORRELATION_WINDOW},
+            code=[cache_correlations],
+            outputs=[CORRELATION_CACHE]
+        ),
+        Stage(
+            "global_trends",
+            lambda intermediate_df: analyze_global_trends(
+                intermediate_df,
+                csv_path(GLOBAL_TRENDS_CSV)
+            ),
+            deps=["intermediate"],
+            code=[analyze_global_trends],
+            outputs=csv_outputs(GLOBAL_TRENDS_CSV),
+            load=lambda: load_frame(GLOBAL_TRENDS_CSV)
+        ),
+
+        Stage(
+            "incremental_state",
+            lambda intermediate_df, rolling_window, recent_years: build_incremental_state(
+                intermediate_df,
+                INCREMENTAL_STATE,
+                rolling_window=rolling_window,
+                recent_years=recent_years
+            ),
+            deps=["intermediate"],
+            params={"rolling_window": ROLLING_WINDOW, "recent_years": RECENT_YEARS},
+            code=[build_incremental_state],
+            outputs=[INCREMENTAL_STATE]
+        ),
+
+        # --- Static visualizations ---
+        Stage(
+            "charts",
+            lambda global_df, summary_df, trends_df, intermediate_df, top_n, country_id: render_static_charts(
+                global_df,
+                summary_df,
+                trends_df,
+                intermediate_df,
+                top_n,
+                country_id,
+                force=force
+            ),
+            deps=["global_trends", "country_summary", "country_trends", "intermediate"],
+            params={"top_n": TOP_N, "country_id": COUNTRY_ID},
+            code=["src.visualization", render_charts, RenderCache],
+            outputs=[
+                PNG_GLOBAL_INFLATION,
+                PNG_GLOBAL_GDP_GROWTH,
+                PNG_TOP_COUNTRIES_GDP,
+                PNG_CRISIS_COUNTRIES,
+                PNG_COUNTRY_GDP,
+                PNG_COUNTRY_INFLATION,
+            ]
+        ),
+
+        Stage(
+            "country_charts",
+            lambda intermediate_df: render_all_country_charts(intermediate_df, force=force),
+            deps=["intermediate"],
+            code=["src.visualization", render_charts, RenderCache],
+            outputs=[PNG_COUNTRIES_DIR]
+        ),
+
+        # --- Interactive dashboard ---
+        Stage(
+            "dashboard",
+            lambda intermediate_df, global_df, summary_df, country_id, plotlyjs: render_dashboard(
+                intermediate_df,
+                global_df,
+                summary_df,
+                country_id,
+                plotlyjs,
+                force=force
+            ),
+            deps=["intermediate", "global_trends", "country_summary"],
+            params={"country_id": COUNTRY_ID, "plotlyjs": plotlyjs},
+            code=["src.animated_map", RenderCache],
+            outputs=[DASHBOARD_HTML]
+        ),
+    ]
+
+
+def run_pipeline(
+    save_csv=True,
+    force=False,
+    profile=False,
+    command=None,
+    only=None,
+    skip=None,
+    plotlyjs="directory"
+):
+    """
+    Runs the pipeline, skipping every stage whose inputs, parameters and
+    code are unchanged since the previous run (see src.stages).
+    Per-stage metrics are appended to outputs/logs/run_log.jsonl; with
+    profile=True each stage also writes a cProfile dump.
+
+    - command: one of COMMANDS, runs its stages and their dependencies
+      (default: every stage)
+    - only / skip: exact stage names to run / leave out
+    - plotlyjs: how the dashboard loads plotly.js (PLOTLYJS_MODES)
+    """
+
+    stages = build_stages(save_csv=save_csv, force=force, plotlyjs=plotlyjs)
+
+    if only is None and command is not None:
+        only = with_dependencies(stages, COMMANDS[command])
+
+    return run_stages(
+        stages,
+        STAGE_STATE,
+        force=force,
+        run_log=RUN_LOG,
+        profile_dir=PROFILE_DIR if profile else None,
+        only=only,
+        skip=skip
     )
 
-    plot_country_gdp_trend(
-        INTERMEDIATE_DATA,
-        country_id="tr",
-        output_path=PNG_COUNTRY_GDP
+
+def run_incremental_update(new_rows_path):
+    """
+    Appends newly published raw rows to the cleaned/intermediate datasets
+    and refreshes the CSV outputs from the stored aggregate state,
+    without recomputing the full history.
+
+    The rows are also kept in data/raw/appended/, which is an input of
+    the "prepare" stage: the next pipeline run rebuilds the stages the
+    update does not maintain (features, slopes, charts, ...) with the
+    new years, and later full rebuilds keep them.
+    """
+
+    return apply_incremental_update(
+        new_rows_path,
+        INCREMENTAL_STATE,
+        rolling_window=ROLLING_WINDOW,
+        recent_years=RECENT_YEARS,
+        cleaned_path=CLEANED_DATA,
+        intermediate_path=INTERMEDIATE_DATA,
+        cleaned_parquet=CLEANED_PARQUET,
+        intermediate_parquet=INTERMEDIATE_PARQUET,
+        raw_archive_dir=RAW_APPENDED_DIR,
+        summary_path=COUNTRY_SUMMARY_CSV,
+        trends_path=COUNTRY_TRENDS_CSV,
+        global_path=GLOBAL_TRENDS_CSV
     )
 
-    plot_country_inflation_trend(
-        INTERMEDIATE_DATA,
-        country_id="tr",
-        output_path=PNG_COUNTRY_INFLATION
+
+def _stage_list(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    known = [stage.name for stage in build_stages()]
+
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(known)}"
+        )
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Global economic indicators pipeline")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=sorted(COMMANDS),
+        help="run one group of stages (plus their dependencies); default: the whole pipeline"
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-run every stage even if its fingerprint is unchanged"
+    )
+    parser.add_argument(
+        "--no-csv",
+        action="store_true",
+        help="do not write the CSV artifacts"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write a cProfile dump per stage to outputs/logs/profiles/"
+    )
+    parser.add_argument(
+        "--only",
+        type=_stage_list,
+        metavar="STAGES",
+        help="comma-separated stages to run; other stages are loaded from their outputs"
+    )
+    parser.add_argument(
+        "--skip",
+        type=_stage_list,
+        metavar="STAGES",
+        help="comma-separated stages to leave out"
+    )
+    parser.add_argument(
+        "--plotlyjs",
+        choices=PLOTLYJS_MODES,
+        default="directory",
+        help="how docs/index.html loads plotly.js: a bundled docs/plotly.min.js "
+             "(default, works offline), inline in the page, or from the CDN"
+    )
+    parser.add_argument(
+        "--append",
+        metavar="NEW_ROWS_CSV",
+        help="append new raw rows (same schema as the raw dataset) incrementally"
+    )
+    args = parser.parse_args(argv)
+
+    if args.append:
+        run_incremental_update(args.append)
+        return
 
-    build_dashboard(
-        intermediate_csv=INTERMEDIATE_DATA,
-        global_trends_csv=GLOBAL_TRENDS_CSV,
-        country_summary_csv=COUNTRY_SUMMARY_CSV,
-        country_id="tr",
-        output_html_path="docs/index.html"
+    run_pipeline(
+        save_csv=not args.no_csv,
+        force=args.force,
+        profile=args.profile,
+        command=args.command,
+        only=args.only,
+        skip=args.skip,
+        plotlyjs=args.plotlyjs
     )
 
 
@@ -1,10 +1,18 @@
 
+import html
+import json
 import os
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from src.instrumentation import add_stage_metric, file_size
+from src.io_utils import load_frame
+from src.panel import EconomicPanel
+from src.render_cache import render_key
 
 
 # -----------------------------
@@ -57,18 +65,359 @@ def _standard_layout(fig, y_title=None):
     return fig
 
 
+def _compact_gdp_map(df_map, year_step=1, precision=2):
+    """
+    Animated log-GDP choropleth with a compact frame encoding.
+
+    Country codes and names are stored once in the base trace; each
+    frame only carries the rounded z values aligned to that list
+    (null where a country has no data that year). With year_step > 1
+    only every Nth year (plus the last one) becomes a frame.
+    """
+
+    countries = (
+        df_map[["Country_ISO3", "Country"]]
+        .dropna(subset=["Country_ISO3"])
+        .drop_duplicates("Country_ISO3")
+        .sort_values("Country_ISO3")
+    )
+
+    z_table = (
+        df_map.assign(z=np.log10(df_map["GDP"]).round(precision))
+        .pivot_table(index="Year", columns="Country_ISO3", values="z", aggfunc="first")
+        .reindex(columns=countries["Country_ISO3"])
+    )
+
+    years = list(z_table.index[::year_step])
+    if years[-1] != z_table.index[-1]:
+        years.append(z_table.index[-1])
+
+    def z_values(year):
+        row = z_table.loc[year]
+        return [None if pd.isna(v) else float(v) for v in row]
+
+    map_fig = go.Figure(
+        data=[
+            go.Choropleth(
+                locations=countries["Country_ISO3"].tolist(),
+                locationmode="ISO-3",
+                z=z_values(years[0]),
+                text=countries["Country"].tolist(),
+                hovertemplate=f"%{{text}}<br>GDP (log scale): %{{z:.{precision}f}}<extra></extra>",
+                coloraxis="coloraxis"
+            )
+        ],
+        frames=[
+            go.Frame(name=str(year), data=[go.Choropleth(z=z_values(year))])
+            for year in years
+        ]
+    )
+
+    frame_args = dict(
+        frame=dict(duration=500, redraw=True),
+        mode="immediate",
+        transition=dict(duration=0)
+    )
+
+    map_fig.update_layout(
+        title="Global GDP Distribution Over Time",
+        geo=dict(projection_type="natural earth"),
+        coloraxis=dict(
+            colorscale=[GRID_COLOR, LIGHT_COLOR, MAIN_COLOR],
+            colorbar=dict(title="GDP (log scale)")
+        ),
+        updatemenus=[dict(
+            type="buttons",
+            direction="left",
+            x=0.1, y=0, xanchor="right", yanchor="top",
+            pad=dict(r=10, t=70),
+            showactive=False,
+            buttons=[
+                dict(label="&#9654;", method="animate", args=[None, dict(frame_args, fromcurrent=True)]),
+                dict(label="&#9724;", method="animate", args=[[None], dict(frame_args, frame=dict(duration=0, redraw=False))]),
+            ]
+        )],
+        sliders=[dict(
+            x=0.1, y=0, xanchor="left", yanchor="top",
+            len=0.9,
+            pad=dict(b=10, t=60),
+            currentvalue=dict(prefix="Year="),
+            steps=[
+                dict(label=str(year), method="animate", args=[[str(year)], frame_args])
+                for year in years
+            ]
+        )]
+    )
+
+    return map_fig
+
+
+def figure_payload_sizes(figures):
+    """
+    Serialized JSON size in bytes of each named figure.
+    """
+
+    return {name: len(fig.to_json().encode("utf-8")) for name, fig in figures.items()}
+
+
+COUNTRY_SHARDS_SUBDIR = os.path.join("data", "countries")
+
+# file name plotly's include_plotlyjs="directory" mode loads the
+# library from, relative to the page
+PLOTLYJS_BUNDLE = "plotly.min.js"
+
+
+def write_plotlyjs_bundle(output_dir):
+    """
+    Writes the plotly.js bundle of the installed plotly version next to
+    the dashboard, so the page works offline. Skipped when an identical
+    bundle is already there.
+    """
+
+    path = os.path.join(output_dir, PLOTLYJS_BUNDLE)
+    bundle = get_plotlyjs().encode("utf-8")
+
+    if os.path.isfile(path) and os.path.getsize(path) == len(bundle):
+        with open(path, "rb") as f:
+            if f.read() == bundle:
+                return path
+
+    with open(path, "wb") as f:
+        f.write(bundle)
+    add_stage_metric("bytes_written", len(bundle))
+
+    return path
+
+# columns read from each input: intermediate panel (map and country
+# shards), global trends and country summary
+DASHBOARD_PANEL_COLUMNS = [
+    "Country_ID",
+    "Country",
+    "Country_ISO3",
+    "Year",
+    "GDP",
+    "GDP_rolling_avg",
+    "Inflation_CPI",
+    "Inflation_rolling_avg",
+]
+DASHBOARD_GLOBAL_COLUMNS = ["Year", "global_mean_inflation", "mean_global_gdp_growth"]
+DASHBOARD_SUMMARY_COLUMNS = ["country_name", "avg_gdp"]
+
+
+def _country_trend_figure(country_df, value_col, rolling_col, title, y_title):
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=country_df["Year"],
+            y=country_df[value_col],
+            mode="lines",
+            line=dict(color=LIGHT_COLOR, width=1.8)
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=country_df["Year"],
+            y=country_df[rolling_col],
+            mode="lines",
+            line=dict(color=MAIN_COLOR, width=2.5)
+        )
+    )
+    fig.update_layout(title=title)
+    return _standard_layout(fig, y_title)
+
+
+def _rounded_list(values, decimals):
+    if decimals == 0:
+        return [None if pd.isna(v) else int(round(v)) for v in values]
+    return [None if pd.isna(v) else round(float(v), decimals) for v in values]
+
+
+def write_country_shards(panel, shards_dir):
+    """
+    Writes one compact JSON file per country (<Country_ID>.json) with the
+    series behind the country drill-down charts. Stale shards are removed.
+    panel: EconomicPanel or intermediate DataFrame.
+
+    Returns a list of (Country_ID, Country) pairs sorted by name.
+    """
+
+    os.makedirs(shards_dir, exist_ok=True)
+    for name in os.listdir(shards_dir):
+        if name.endswith(".json"):
+            os.remove(os.path.join(shards_dir, name))
+
+    if not isinstance(panel, EconomicPanel):
+        panel = EconomicPanel(panel)
+
+    countries = []
+    for country_id in panel.countries:
+        country_df = panel.country(country_id)
+        shard = {
+            "id": country_id,
+            "name": country_df["Country"].iloc[0],
+            "years": country_df["Year"].astype(int).tolist(),
+            "gdp": _rounded_list(country_df["GDP"], 0),
+            "gdp_rolling": _rounded_list(country_df["GDP_rolling_avg"], 0),
+            "inflation": _rounded_list(country_df["Inflation_CPI"], 3),
+            "inflation_rolling": _rounded_list(country_df["Inflation_rolling_avg"], 3),
+        }
+
+        with open(os.path.join(shards_dir, f"{country_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(shard, f, separators=(",", ":"))
+
+        countries.append((country_id, shard["name"]))
+
+    print(f"Country shards saved to: {shards_dir} ({len(countries)} countries)")
+    return sorted(countries, key=lambda item: item[1])
+
+
+def _country_selector_html(countries, country_id):
+    """
+    Country selector plus two empty chart containers. The selected
+    country's shard is fetched on demand and drawn with the same
+    layout as the static country charts.
+    """
+
+    empty = pd.DataFrame(columns=["Year", "v", "r"])
+    layouts = {
+        "gdp": json.loads(_country_trend_figure(empty, "v", "r", "", "GDP").to_json())["layout"],
+        "inflation": json.loads(_country_trend_figure(empty, "v", "r", "", "Inflation (%)").to_json())["layout"],
+    }
+
+    # both layouts share the same (large) plotly template; embed it once
+    template = layouts["gdp"].pop("template", None)
+    layouts["inflation"].pop("template", None)
+
+    options = "".join(
+        f"<option value='{cid}'{' selected' if cid == country_id else ''}>{html.escape(str(name))}</option>"
+        for cid, name in countries
+    )
+
+    shard_url = COUNTRY_SHARDS_SUBDIR.replace(os.sep, "/")
+
+    return f"""
+<h2 style='color:{DARK_COLOR}'>Country Drill-down</h2>
+<select id='country-select'>{options}</select>
+<div id='country-gdp'></div>
+<div id='country-inflation'></div>
+<script>
+(function () {{
+    var layouts = {json.dumps(layouts, separators=(",", ":"))};
+    var template = {json.dumps(template, separators=(",", ":"))};
+    var select = document.getElementById("country-select");
+
+    function traces(years, values, rolling) {{
+        return [
+            {{x: years, y: values, mode: "lines", line: {{color: "{LIGHT_COLOR}", width: 1.8}}}},
+            {{x: years, y: rolling, mode: "lines", line: {{color: "{MAIN_COLOR}", width: 2.5}}}}
+        ];
+    }}
+
+    function withTitle(layout, text) {{
+        return Object.assign({{}}, layout, {{
+            template: template,
+            title: Object.assign({{}}, layout.title, {{text: text}})
+        }});
+    }}
+
+    function show(countryId) {{
+        fetch("{shard_url}/" + countryId + ".json")
+            .then(function (response) {{ return response.json(); }})
+            .then(function (shard) {{
+                var label = shard.id.toUpperCase();
+                Plotly.react("country-gdp", traces(shard.years, shard.gdp, shard.gdp_rolling),
+                    withTitle(layouts.gdp, "GDP Trend for " + label));
+                Plotly.react("country-inflation", traces(shard.years, shard.inflation, shard.inflation_rolling),
+                    withTitle(layouts.inflation, "Inflation Trend for " + label));
+            }});
+    }}
+
+    select.addEventListener("change", function () {{ show(select.value); }});
+    if (select.value) {{ show(select.value); }}
+}})();
+</script>
+"""
+
+
 def build_dashboard(
     intermediate_csv,
     global_trends_csv,
     country_summary_csv,
     country_id="tr",
-    output_html_path="docs/index.html"
+    output_html_path="docs/index.html",
+    compact_map=True,
+    map_precision=2,
+    map_year_step=1,
+    include_plotlyjs="directory",
+    country_shards=True,
+    cache=None,
+    force=False
 ):
-    os.makedirs(os.path.dirname(output_html_path), exist_ok=True)
+    """
+    Writes the interactive HTML dashboard.
+
+    - compact_map: encode the animated map with shared per-country
+      metadata and rounded per-frame values (see _compact_gdp_map);
+      False keeps the plotly.express encoding
+    - map_precision / map_year_step: rounding and frame thinning of the
+      compact map
+    - include_plotlyjs: how the page loads plotly.js. "directory"
+      (default) writes the bundle next to the page (PLOTLYJS_BUNDLE)
+      and works offline and on GitHub Pages; "inline" (or True) embeds
+      it in the page (about 4.5 MB); "cdn" loads it from the plotly
+      CDN and needs network access
+    - country_shards: write one JSON shard per country next to the
+      page and add a country selector that fetches a shard only when it
+      is picked (country_id is preselected); False embeds the traces of
+      country_id only. Browsers block fetch() from file:// pages, so
+      shard mode needs the page to be served (e.g. GitHub Pages or
+      python -m http.server).
+    - cache: src.render_cache.RenderCache; the page (and its shards) is
+      only rebuilt when the data it shows, the parameters or this
+      module's code changed
+    - force: rebuild the page even if the cache says it is unchanged
+
+    Returns the JSON payload size of each figure in bytes.
+    """
 
-    df_inter = pd.read_csv(intermediate_csv)
-    df_global = pd.read_csv(global_trends_csv)
-    df_country = pd.read_csv(country_summary_csv)
+    output_dir = os.path.dirname(output_html_path)
+    os.makedirs(output_dir, exist_ok=True)
+    shards_dir = os.path.join(output_dir, COUNTRY_SHARDS_SUBDIR)
+
+    if include_plotlyjs == "inline":
+        include_plotlyjs = True
+
+    df_inter = load_frame(intermediate_csv, columns=DASHBOARD_PANEL_COLUMNS)
+    df_global = load_frame(global_trends_csv, columns=DASHBOARD_GLOBAL_COLUMNS)
+    df_country = load_frame(country_summary_csv, columns=DASHBOARD_SUMMARY_COLUMNS)
+
+    key = None
+    if cache is not None:
+        key = render_key(
+            build_dashboard,
+            df_inter,
+            df_global,
+            df_country,
+            {
+                "country_id": country_id,
+                "compact_map": compact_map,
+                "map_precision": map_precision,
+                "map_year_step": map_year_step,
+                "include_plotlyjs": include_plotlyjs,
+                "country_shards": country_shards,
+            }
+        )
+
+        shards_ok = not country_shards or os.path.isdir(shards_dir)
+        bundle_ok = (
+            include_plotlyjs != "directory"
+            or os.path.isfile(os.path.join(output_dir, PLOTLYJS_BUNDLE))
+        )
+        if shards_ok and bundle_ok and not force and cache.is_fresh(output_html_path, key):
+            print(f"Dashboard unchanged: {output_html_path}")
+            return cache.info(output_html_path)
+
+    panel = EconomicPanel(df_inter)
 
     # =================================================
     # Animated GDP Map
@@ -78,19 +427,26 @@ def build_dashboard(
     z_min = np.log10(df_map["GDP"].min())
     z_max = np.log10(df_map["GDP"].max())
 
-    map_fig = px.choropleth(
-        df_map,
-        locations="Country_ISO3",
-        locationmode="ISO-3",
-        color=np.log10(df_map["GDP"]),
-        hover_name="Country",
-        animation_frame="Year",
-        projection="natural earth",
-        color_continuous_scale=[GRID_COLOR, LIGHT_COLOR, MAIN_COLOR],
-        labels={"color": "GDP (log scale)"},
-        title="Global GDP Distribution Over Time",
-        range_color=[z_min, z_max]
-    )
+    if compact_map:
+        map_fig = _compact_gdp_map(
+            df_map,
+            year_step=map_year_step,
+            precision=map_precision
+        )
+    else:
+        map_fig = px.choropleth(
+            df_map,
+            locations="Country_ISO3",
+            locationmode="ISO-3",
+            color=np.log10(df_map["GDP"]),
+            hover_name="Country",
+            animation_frame="Year",
+            projection="natural earth",
+            color_continuous_scale=[GRID_COLOR, LIGHT_COLOR, MAIN_COLOR],
+            labels={"color": "GDP (log scale)"},
+            title="Global GDP Distribution Over Time",
+            range_color=[z_min, z_max]
+        )
 
     map_fig.update_layout(
         geo=dict(showframe=False, showcoastlines=False),
@@ -151,52 +507,33 @@ def build_dashboard(
     top_fig = _standard_layout(top_fig, "Average GDP")
 
     # =================================================
-    # Country GDP Trend
+    # Country GDP / Inflation Trends
     # =================================================
-    country_df = df_inter[df_inter["Country_ID"] == country_id]
+    figures = {
+        "map": map_fig,
+        "global_inflation": inflation_fig,
+        "global_gdp_growth": gdp_growth_fig,
+        "top_countries": top_fig,
+    }
 
-    gdp_country_fig = go.Figure()
-    gdp_country_fig.add_trace(
-        go.Scatter(
-            x=country_df["Year"],
-            y=country_df["GDP"],
-            mode="lines",
-            line=dict(color=LIGHT_COLOR, width=1.8)
-        )
-    )
-    gdp_country_fig.add_trace(
-        go.Scatter(
-            x=country_df["Year"],
-            y=country_df["GDP_rolling_avg"],
-            mode="lines",
-            line=dict(color=MAIN_COLOR, width=2.5)
-        )
-    )
-    gdp_country_fig.update_layout(title=f"GDP Trend for {country_id.upper()}")
-    gdp_country_fig = _standard_layout(gdp_country_fig, "GDP")
+    if country_shards:
+        countries = write_country_shards(panel, shards_dir)
+        country_html = _country_selector_html(countries, country_id)
+    else:
+        country_df = panel.country(country_id)
 
-    # =================================================
-    # Country Inflation Trend
-    # =================================================
-    infl_country_fig = go.Figure()
-    infl_country_fig.add_trace(
-        go.Scatter(
-            x=country_df["Year"],
-            y=country_df["Inflation_CPI"],
-            mode="lines",
-            line=dict(color=LIGHT_COLOR, width=1.8)
+        figures["country_gdp"] = _country_trend_figure(
+            country_df, "GDP", "GDP_rolling_avg",
+            f"GDP Trend for {country_id.upper()}", "GDP"
         )
-    )
-    infl_country_fig.add_trace(
-        go.Scatter(
-            x=country_df["Year"],
-            y=country_df["Inflation_rolling_avg"],
-            mode="lines",
-            line=dict(color=MAIN_COLOR, width=2.5)
+        figures["country_inflation"] = _country_trend_figure(
+            country_df, "Inflation_CPI", "Inflation_rolling_avg",
+            f"Inflation Trend for {country_id.upper()}", "Inflation (%)"
+        )
+        country_html = "".join(
+            pio.to_html(figures[name], full_html=False, include_plotlyjs=False)
+            for name in ["country_gdp", "country_inflation"]
         )
-    )
-    infl_country_fig.update_layout(title=f"Inflation Trend for {country_id.upper()}")
-    infl_country_fig = _standard_layout(infl_country_fig, "Inflation (%)")
 
     # =================================================
     # Write Dashboard
@@ -205,11 +542,29 @@ def build_dashboard(
         f.write("<html><head><title>Global Economic Indicators Dashboard</title></head><body>")
         f.write("<h1 style='color:#3E7C7C'>Global Economic Indicators Analysis</h1>")
 
-        f.write(pio.to_html(map_fig, full_html=False, include_plotlyjs="cdn"))
+        f.write(pio.to_html(map_fig, full_html=False, include_plotlyjs=include_plotlyjs))
         f.write(pio.to_html(inflation_fig, full_html=False, include_plotlyjs=False))
         f.write(pio.to_html(gdp_growth_fig, full_html=False, include_plotlyjs=False))
         f.write(pio.to_html(top_fig, full_html=False, include_plotlyjs=False))
-        f.write(pio.to_html(gdp_country_fig, full_html=False, include_plotlyjs=False))
-        f.write(pio.to_html(infl_country_fig, full_html=False, include_plotlyjs=False))
+        f.write(country_html)
 
         f.write("</body></html>")
+
+    add_stage_metric("bytes_written", file_size(output_html_path))
+    if include_plotlyjs == "directory":
+        write_plotlyjs_bundle(output_dir)
+    if country_shards:
+        add_stage_metric("bytes_written", file_size(shards_dir))
+
+    sizes = figure_payload_sizes(figures)
+
+    if key is not None:
+        cache.record(output_html_path, key, info=sizes)
+
+    print(
+        f"Dashboard saved to: {output_html_path} ("
+        + ", ".join(f"{name}={size / 1024:.1f}KB" for name, size in sizes.items())
+        + ")"
+    )
+
+    return sizes
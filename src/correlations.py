@@ -0,0 +1,258 @@
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import add_stage_metric, file_size
+from src.io_utils import load_frame
+from src.panel_ops import group_boundaries
+from src.schema import INDICATOR_COLUMNS
+
+
+CORRELATION_WINDOW = 10
+
+
+# =================================================
+# Pairwise moments
+# =================================================
+# Correlations use pairwise-complete observations (a row counts for a
+# pair when both indicators are present), like DataFrame.corr(). The
+# moments of all pairs (i, j) for one indicator i are accumulated at
+# once, so the loop runs over indicators, never over groups or rows.
+def _standardize(values, starts, group_idx):
+    """
+    Centres and scales every indicator by its group's mean and spread.
+    Correlations are unchanged, but the running sums stay O(rows) and
+    the variances do not cancel out for large-valued indicators.
+    """
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    n = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nan_to_num(np.add.reduceat(filled, starts, axis=0) / n)[group_idx]
+        centred = np.where(valid, values - mean, 0.0)
+        scale = np.sqrt(np.add.reduceat(centred * centred, starts, axis=0) / n)
+
+    scale = np.where(scale > 0, scale, 1.0)[group_idx]
+    return np.where(valid, centred / scale, np.nan)
+
+
+def _correlation(n, s_x, s_y, s_xx, s_yy, s_xy, min_periods):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = s_xy - s_x * s_y / n
+        var_x = s_xx - s_x * s_x / n
+        var_y = s_yy - s_y * s_y / n
+        corr = cov / np.sqrt(var_x * var_y)
+
+    ok = (n >= max(min_periods, 2)) & (var_x > 1e-12 * n) & (var_y > 1e-12 * n)
+    return np.where(ok, np.clip(corr, -1, 1), np.nan)
+
+
+def _pair_correlations(values, window_sums, min_periods):
+    """
+    Yields (i, j, n_obs, correlation) for every indicator pair i < j.
+    window_sums(x) reduces a (rows x k) array to the windows / groups.
+    """
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    n_indicators = values.shape[1]
+
+    for i in range(n_indicators - 1):
+        both = valid[:, i:i + 1] & valid[:, i + 1:]
+        x = np.where(both, filled[:, i:i + 1], 0.0)
+        y = np.where(both, filled[:, i + 1:], 0.0)
+
+        n = window_sums(both.astype(float))
+        corr = _correlation(
+            n,
+            window_sums(x),
+            window_sums(y),
+            window_sums(x * x),
+            window_sums(y * y),
+            window_sums(x * y),
+            min_periods
+        )
+
+        for offset in range(n_indicators - 1 - i):
+            yield i, i + 1 + offset, n[:, offset], corr[:, offset]
+
+
+def _long_frame(keys, indicators, pairs):
+    """
+    Long result: one row per key row and indicator pair.
+    """
+
+    pairs = list(pairs)
+    n_keys = len(keys)
+
+    frame = keys.take(np.tile(np.arange(n_keys), len(pairs))).reset_index(drop=True)
+    frame["indicator_x"] = np.repeat([indicators[i] for i, _, _, _ in pairs], n_keys)
+    frame["indicator_y"] = np.repeat([indicators[j] for _, j, _, _ in pairs], n_keys)
+    frame["n_obs"] = np.concatenate([n for _, _, n, _ in pairs] or [[]]).astype(int)
+    frame["correlation"] = np.concatenate([corr for _, _, _, corr in pairs] or [[]])
+
+    return frame
+
+
+# =================================================
+# Rolling (per country) and cross-sectional correlations
+# =================================================
+def rolling_correlations(df, window=CORRELATION_WINDOW, indicators=None, min_periods=None):
+    """
+    Trailing rolling correlation of every indicator pair, per country.
+
+    The window covers the last `window` rows of the country (clipped at
+    its first year); min_periods defaults to window, like
+    DataFrame.rolling().corr().
+
+    Output (long format): Country_ID, Country, Year, indicator_x,
+    indicator_y, n_obs, correlation
+    """
+
+    indicators = [col for col in (indicators or INDICATOR_COLUMNS) if col in df.columns]
+    min_periods = window if min_periods is None else min_periods
+
+    df = df.sort_values(["Country_ID", "Year"]).reset_index(drop=True)
+    starts, _, group_idx = group_boundaries(df["Country_ID"])
+
+    values = _standardize(df[indicators].to_numpy(dtype=float), starts, group_idx)
+
+    hi = np.arange(1, len(df) + 1)
+    lo = np.maximum(hi - window, starts[group_idx])
+
+    def window_sums(x):
+        cumulative = np.zeros((len(x) + 1,) + x.shape[1:])
+        np.cumsum(x, axis=0, out=cumulative[1:])
+        return cumulative[hi] - cumulative[lo]
+
+    return _long_frame(
+        df[["Country_ID", "Country", "Year"]],
+        indicators,
+        _pair_correlations(values, window_sums, min_periods)
+    )
+
+
+def cross_section_correlations(df, indicators=None, min_periods=3):
+    """
+    Correlation of every indicator pair across countries, per year
+    (the global cross-section).
+
+    Output (long format): Year, indicator_x, indicator_y, n_obs,
+    correlation
+    """
+
+    indicators = [col for col in (indicators or INDICATOR_COLUMNS) if col in df.columns]
+
+    df = df.sort_values("Year", kind="stable").reset_index(drop=True)
+    starts, _, group_idx = group_boundaries(df["Year"])
+
+    values = _standardize(df[indicators].to_numpy(dtype=float), starts, group_idx)
+
+    def window_sums(x):
+        return np.add.reduceat(x, starts, axis=0)
+
+    return _long_frame(
+        df[["Year"]].iloc[starts].reset_index(drop=True),
+        indicators,
+        _pair_correlations(values, window_sums, min_periods)
+    )
+
+
+# =================================================
+# Disk cache
+# =================================================
+def data_fingerprint(df, indicators):
+    """
+    Content hash of the (Country_ID, Year, indicators) columns,
+    independent of row order and of where the frame was loaded from.
+    """
+
+    columns = ["Country_ID", "Year"] + list(indicators)
+    df = df[columns].sort_values(["Country_ID", "Year"])
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, kind, df, indicators, window, min_periods):
+    key = {
+        "kind": kind,
+        "window": window,
+        "min_periods": min_periods,
+        "data": data_fingerprint(df, indicators),
+        "code": inspect.getsource(inspect.getmodule(_cache_path)),
+    }
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+    name = f"{kind}-w{window}-{digest[:16]}.parquet" if window else f"{kind}-{digest[:16]}.parquet"
+    return os.path.join(cache_dir, name)
+
+
+def load_correlations(
+    input_path,
+    cache_dir,
+    kind="country",
+    window=CORRELATION_WINDOW,
+    indicators=None,
+    min_periods=None
+):
+    """
+    Rolling ("country") or cross-sectional ("global") correlations of
+    a panel, read from cache_dir when they were already computed for
+    the same data, window and parameters.
+
+    Cache entries are Parquet files named <kind>-w<window>-<key>.parquet;
+    the key hashes the panel content (data_fingerprint), the parameters
+    and this module's source. Stale entries are never read and can be
+    deleted at any time.
+    """
+
+    columns = ["Country_ID", "Country", "Year"] + list(indicators or INDICATOR_COLUMNS)
+
+    df = load_frame(input_path, columns=columns)
+    indicators = [col for col in (indicators or INDICATOR_COLUMNS) if col in df.columns]
+
+    if kind == "country":
+        compute = lambda: rolling_correlations(df, window, indicators, min_periods)
+    elif kind == "global":
+        window = None
+        min_periods = 3 if min_periods is None else min_periods
+        compute = lambda: cross_section_correlations(df, indicators, min_periods)
+    else:
+        raise ValueError(f"Unknown correlation kind: {kind}")
+
+    path = _cache_path(cache_dir, kind, df, indicators, window, min_periods)
+
+    if os.path.exists(path):
+        add_stage_metric("bytes_read", file_size(path))
+        return pd.read_parquet(path)
+
+    corr_df = compute()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    corr_df.to_parquet(path, index=False)
+    add_stage_metric("bytes_written", file_size(path))
+    print(f"Correlations saved to: {path}")
+
+    return corr_df
+
+
+def cache_correlations(input_path, cache_dir, window=CORRELATION_WINDOW):
+    """
+    Computes (or reuses) the rolling and cross-sectional correlations of
+    a panel, so later sessions read them from cache_dir.
+    Returns the rolling correlations.
+    """
+
+    df = load_frame(input_path, columns=["Country_ID", "Country", "Year"] + INDICATOR_COLUMNS)
+
+    load_correlations(df, cache_dir, kind="global")
+    return load_correlations(df, cache_dir, kind="country", window=window)
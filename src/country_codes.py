@@ -0,0 +1,133 @@
+import pandas as pd
+import os
+
+
+# -----------------------------
+# Reference files
+# -----------------------------
+REFERENCE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "reference"
+)
+
+ISO3_LOOKUP_PATH = os.path.join(REFERENCE_DIR, "iso3_lookup.csv")
+ISO3_OVERRIDES_PATH = os.path.join(REFERENCE_DIR, "iso3_overrides.csv")
+
+# unresolved names listed in the log; the full list goes to a CSV
+UNRESOLVED_PREVIEW = 10
+UNRESOLVED_FILENAME = "iso3_unresolved.csv"
+
+
+def _read_mapping(path):
+    if not path or not os.path.exists(path):
+        return {}
+
+    mapping_df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return dict(zip(mapping_df["Country"], mapping_df["Country_ISO3"]))
+
+
+def _lookup_pycountry(names):
+    import pycountry
+
+    resolved = {}
+    for name in names:
+        try:
+            resolved[name] = pycountry.countries.lookup(name).alpha_3
+        except LookupError:
+            resolved[name] = ""
+
+    return resolved
+
+
+def resolve_iso3(
+    country_names,
+    lookup_path=ISO3_LOOKUP_PATH,
+    overrides_path=ISO3_OVERRIDES_PATH
+):
+    """
+    Resolves country names to ISO3 codes, once per distinct name.
+
+    Resolution order:
+    - Override file (names pycountry does not know)
+    - Persistent lookup table from previous runs
+    - pycountry lookup (only for names not seen before)
+
+    New pycountry results are appended to the lookup table, so repeated
+    runs never hit pycountry again. Names that cannot be resolved are
+    cached as empty strings and returned separately.
+
+    Returns (mapping, unresolved) where mapping is name -> ISO3 or None.
+    """
+
+    names = pd.unique(pd.Series(country_names).dropna())
+
+    overrides = _read_mapping(overrides_path)
+    cached = _read_mapping(lookup_path)
+
+    missing = [name for name in names if name not in overrides and name not in cached]
+
+    if missing:
+        cached.update(_lookup_pycountry(missing))
+
+        if lookup_path:
+            os.makedirs(os.path.dirname(lookup_path), exist_ok=True)
+            pd.DataFrame(
+                sorted(cached.items()),
+                columns=["Country", "Country_ISO3"]
+            ).to_csv(lookup_path, index=False)
+
+    mapping = {}
+    for name in names:
+        iso3 = overrides.get(name) or cached.get(name)
+        mapping[name] = iso3 or None
+
+    unresolved = sorted(name for name, iso3 in mapping.items() if iso3 is None)
+
+    return mapping, unresolved
+
+
+def report_unresolved(unresolved, lookup_path=ISO3_LOOKUP_PATH):
+    """
+    Prints the number of unresolved names and the first few of them.
+
+    The full list is written to iso3_unresolved.csv next to the lookup
+    table (a stale list is removed once every name resolves). Nothing
+    is written when lookup_path is None.
+    """
+
+    unresolved_path = (
+        os.path.join(os.path.dirname(lookup_path), UNRESOLVED_FILENAME) if lookup_path else None
+    )
+
+    if not unresolved:
+        if unresolved_path and os.path.exists(unresolved_path):
+            os.remove(unresolved_path)
+        return
+
+    preview = ", ".join(unresolved[:UNRESOLVED_PREVIEW])
+    if len(unresolved) > UNRESOLVED_PREVIEW:
+        preview += f", ... ({len(unresolved) - UNRESOLVED_PREVIEW} more)"
+
+    message = f"Unresolved ISO3 country names ({len(unresolved)}): {preview}"
+
+    if unresolved_path:
+        os.makedirs(os.path.dirname(unresolved_path), exist_ok=True)
+        pd.DataFrame({"Country": unresolved}).to_csv(unresolved_path, index=False)
+        message += f" - full list: {unresolved_path}"
+
+    print(message)
+
+
+def add_iso3_column(df, country_col="Country", iso3_col="Country_ISO3", **kwargs):
+    """
+    Adds an ISO3 column by resolving each distinct country name once
+    and mapping the result back onto the rows.
+    """
+
+    mapping, unresolved = resolve_iso3(df[country_col], **kwargs)
+    df[iso3_col] = df[country_col].map(mapping)
+
+    report_unresolved(unresolved, lookup_path=kwargs.get("lookup_path", ISO3_LOOKUP_PATH))
+
+    return df
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+from src.io_utils import load_frame, save_frame
+from src.panel_ops import group_boundaries
+
+
+# -----------------------------
+# Crisis rules
+# -----------------------------
+# rule name -> conditions (column, op, value) that must all hold in a
+# crisis year; missing values never count as a crisis
+CRISIS_RULES = {
+    "recession": [("GDP_growth_pct", "<", 0)],
+    "stagflation": [("GDP_growth_pct", "<", 0), ("Inflation_CPI", ">", 10)],
+}
+
+_CONDITION_OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def _gdp_growth(df, starts):
+    # reused from the intermediate dataset when present
+    if "GDP_growth_pct" in df.columns:
+        return df["GDP_growth_pct"].to_numpy(dtype=float)
+
+    gdp = df["GDP"].to_numpy(dtype=float)
+    growth = (gdp / np.r_[np.nan, gdp[:-1]] - 1) * 100
+    growth[starts] = np.nan
+    return growth
+
+
+def _crisis_flags(df, conditions, growth):
+    flags = np.ones(len(df), dtype=bool)
+
+    for col, op, value in conditions:
+        values = growth if col == "GDP_growth_pct" else df[col].to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            flags &= _CONDITION_OPS[op](values, value)
+
+    return flags
+
+
+def _segment_reduce(ufunc, values, first, last):
+    """
+    ufunc.reduceat over the closed row ranges [first, last].
+    """
+
+    padded = np.r_[values, values[:1]]
+    bounds = np.ravel(np.column_stack([first, last + 1]))
+    return ufunc.reduceat(padded, bounds)[::2]
+
+
+# =================================================
+# Run-length episode detection
+# =================================================
+def detect_crisis_episodes(df, rules=None):
+    """
+    Finds contiguous crisis episodes of every country at once.
+
+    The panel is sorted by (Country_ID, Year) and every rule's crisis
+    flags are run-length encoded: an episode starts at a flagged row
+    whose previous row is not flagged, belongs to another country or is
+    not the previous year, and ends symmetrically. Episode statistics
+    are segmented sums / minima over the [start, end] row ranges.
+
+    - rules: {name: [(column, op, value), ...]} (default CRISIS_RULES)
+
+    Output (one row per episode): Country_ID, Country, rule, episode
+    (1, 2, ... per country and rule), start_year, end_year,
+    duration_years, cumulative_gdp_loss_pct (compounded GDP decline
+    over the episode), worst_gdp_growth_pct, years_since_previous
+    (from the end of the country's previous episode), recovery_year
+    and recovery_years (first year after the episode in which GDP is
+    back at its pre-crisis level; empty if it never is in the data).
+    """
+
+    df = df.sort_values(["Country_ID", "Year"])
+
+    starts, ends, group_idx = group_boundaries(df["Country_ID"])
+    n_rows = len(df)
+
+    year = df["Year"].to_numpy(dtype=int)
+    gdp = df["GDP"].to_numpy(dtype=float)
+    growth = _gdp_growth(df, starts)
+    log_growth = np.log1p(np.nan_to_num(growth) / 100)
+
+    # row i continues row i - 1 (same country, next year)
+    continues = np.zeros(n_rows, dtype=bool)
+    continues[1:] = (group_idx[1:] == group_idx[:-1]) & (year[1:] == year[:-1] + 1)
+
+    countries = df["Country_ID"].array
+    names = df["Country"].array
+
+    episodes = []
+    for rule, conditions in (rules or CRISIS_RULES).items():
+        flags = _crisis_flags(df, conditions, growth)
+
+        linked = continues & flags & np.r_[False, flags[:-1]]
+        first = np.flatnonzero(flags & ~linked)
+        last = np.flatnonzero(flags & ~np.r_[linked[1:], False])
+
+        if len(first) == 0:
+            continue
+
+        group = group_idx[first]
+
+        # episode number and gap to the previous episode of the country
+        new_group = np.r_[True, group[1:] != group[:-1]]
+        position = np.arange(len(first))
+        episode = position - np.maximum.accumulate(np.where(new_group, position, 0))
+        since_previous = np.r_[np.nan, year[first[1:]] - year[last[:-1]]].astype(float)
+        since_previous[new_group] = np.nan
+
+        # GDP level of the year before the episode
+        has_before = continues[first]
+        pre_gdp = np.where(has_before, gdp[first - 1], np.nan)
+
+        recovery_row = _recovery_rows(gdp, pre_gdp, last, ends[group])
+
+        recovered = recovery_row >= 0
+        recovery_year = np.where(recovered, year[np.maximum(recovery_row, 0)], np.nan)
+
+        episodes.append(pd.DataFrame({
+            "Country_ID": countries[first],
+            "Country": names[first],
+            "rule": rule,
+            "episode": episode + 1,
+            "start_year": year[first],
+            "end_year": year[last],
+            "duration_years": last - first + 1,
+            "cumulative_gdp_loss_pct": (
+                1 - np.exp(_segment_reduce(np.add, log_growth, first, last))
+            ) * 100,
+            "worst_gdp_growth_pct": _segment_reduce(np.fmin, growth, first, last),
+            "years_since_previous": since_previous,
+            "recovery_year": recovery_year,
+            "recovery_years": recovery_year - year[last],
+        }))
+
+    if not episodes:
+        return pd.DataFrame(columns=[
+            "Country_ID", "Country", "rule", "episode", "start_year", "end_year",
+            "duration_years", "cumulative_gdp_loss_pct", "worst_gdp_growth_pct",
+            "years_since_previous", "recovery_year", "recovery_years",
+        ])
+
+    return pd.concat(episodes, ignore_index=True)
+
+
+def _recovery_rows(gdp, pre_gdp, last, group_end):
+    """
+    Row of the first year after each episode (same country) whose GDP
+    reaches the pre-crisis level; -1 when there is none.
+
+    All (episode, following row) pairs are checked in one pass, so the
+    cost is the number of episodes times the years that follow them.
+    """
+
+    lengths = np.where(np.isnan(pre_gdp), 0, group_end - last)
+    episode_of = np.repeat(np.arange(len(last)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = last[episode_of] + 1 + offsets
+
+    hit = gdp[rows] >= pre_gdp[episode_of]
+
+    result = np.full(len(last), -1)
+    hit_episodes, first_hit = np.unique(episode_of[hit], return_index=True)
+    result[hit_episodes] = rows[hit][first_hit]
+
+    return result
+
+
+def compute_crisis_episodes(input_path, output_path, rules=None):
+    """
+    Crisis episodes of the intermediate panel (see
+    detect_crisis_episodes), saved as one row per episode.
+    """
+
+    columns = ["Country_ID", "Country", "Year", "GDP", "GDP_growth_pct"] + [
+        col for conditions in (rules or CRISIS_RULES).values() for col, _, _ in conditions
+    ]
+
+    df = load_frame(input_path, columns=list(dict.fromkeys(columns)))
+
+    episodes_df = detect_crisis_episodes(df, rules=rules)
+
+    save_frame(episodes_df, output_path, "Crisis episodes")
+    return episodes_df
@@ -1,57 +1,181 @@
 import pandas as pd
+import glob
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from src.country_codes import ISO3_LOOKUP_PATH, add_iso3_column, report_unresolved, resolve_iso3
+from src.instrumentation import add_stage_metric, file_size
+from src.io_utils import load_frame, read_csv, save_frame
+from src.schema import (
+    COLUMN_RENAMES,
+    CRITICAL_COLUMNS,
+    PANEL_DTYPES,
+    YEAR_RANGE,
+    apply_schema
+)
+from src.storage import write_dataset
 
 
-def prepare_data(input_path, output_path, drop_na=True, fill_method=None, save_cleaned=True):
+# raw column -> compact dtype of the column it is renamed to; Year is
+# left to _standardize, which drops unparseable years
+RAW_DTYPES = {
+    raw: PANEL_DTYPES[col]
+    for raw, col in COLUMN_RENAMES.items()
+    if col in PANEL_DTYPES and col != "Year"
+}
 
-    df = pd.read_csv(input_path)
 
-    df.rename(columns={
-        'country_name': 'Country',
-        'country_id': 'Country_ID',
-        'year': 'Year',
-        'Inflation (CPI %)': 'Inflation_CPI',
-        'GDP (Current USD)': 'GDP',
-        'GDP per Capita (Current USD)': 'GDP_per_Capita',
-        'Unemployment Rate (%)': 'Unemployment_Rate',
-        'Interest Rate (Real, %)': 'Interest_Rate',
-        'Inflation (GDP Deflator, %)': 'Inflation_GDP_Deflator',
-        'GDP Growth (% Annual)': 'GDP_Growth',
-        'Current Account Balance (% GDP)': 'Current_Account',
-        'Government Expense (% of GDP)': 'Gov_Expense',
-        'Government Revenue (% of GDP)': 'Gov_Revenue',
-        'Tax Revenue (% of GDP)': 'Tax_Revenue',
-        'Gross National Income (USD)': 'GNI',
-        'Public Debt (% of GDP)': 'Public_Debt'
-    }, inplace=True)
+def _standardize(df):
+    """
+    Renames the raw columns, keeps only rows with a realistic year and
+    casts to the compact panel dtypes (see src.schema).
+    Works on the full file or on a single chunk.
+    """
 
+    df = df.rename(columns=COLUMN_RENAMES)
 
     df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
 
     # keep only realistic years
-    df = df[(df["Year"] >= 1900) & (df["Year"] <= 2100)]
-    df["Year"] = df["Year"].astype(int)
+    df = df[(df["Year"] >= YEAR_RANGE[0]) & (df["Year"] <= YEAR_RANGE[1])]
+
+    return apply_schema(df)
+
+
+# =================================================
+# Multi-file ingestion
+# =================================================
+def raw_input_files(input_path):
+    """
+    Resolves a raw input to a list of CSV files:
+    - list / tuple of paths
+    - glob pattern, e.g. "data/raw/regions/*.csv"
+    - directory: every *.csv file in it
+
+    Returns None for a single file or an in-memory frame.
+    """
+
+    if isinstance(input_path, (list, tuple)):
+        return list(input_path)
+
+    if not isinstance(input_path, str):
+        return None
+
+    if os.path.isdir(input_path):
+        files = sorted(glob.glob(os.path.join(input_path, "*.csv")))
+    elif glob.has_magic(input_path):
+        files = sorted(glob.glob(input_path))
+    else:
+        return None
+
+    if not files:
+        raise FileNotFoundError(f"No raw CSV files found for: {input_path}")
+
+    return files
+
+
+def _read_raw(source):
+    """
+    Parses the known raw columns of a CSV file straight into their
+    compact dtypes (in-memory frames go through load_frame).
+    """
+
+    if isinstance(source, str):
+        return _standardize(read_csv(source, columns=list(COLUMN_RENAMES), dtype=RAW_DTYPES))
+    return _standardize(load_frame(source))
+
+
+def read_raw_files(paths, max_workers=None, use_processes=False):
+    """
+    Parses raw CSV files concurrently and merges them into one frame.
+
+    Every file gets the rename, year filter and dtypes of _standardize.
+    Files can split the data by rows (e.g. one file per region) and/or
+    by columns (e.g. one file per indicator extract): rows sharing a
+    (Country_ID, Year) key are combined column-wise, taking the first
+    non-missing value, which amounts to an outer join on the key.
+
+    Threads by default (the CSV parser releases the GIL for most of
+    the work); use_processes=True parses in a process pool instead.
+    """
+
+    executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    if max_workers == 1 or len(paths) == 1:
+        frames = [_read_raw(path) for path in paths]
+    else:
+        with executor(max_workers=max_workers) as pool:
+            frames = list(pool.map(_read_raw, paths))
+
+    add_stage_metric("bytes_read", sum(file_size(path) for path in paths))
+
+    df = apply_schema(pd.concat(frames, ignore_index=True))
+
+    keys = ["Country_ID", "Year"]
+    if df.duplicated(keys).any():
+        columns = list(df.columns)
+        df = (
+            df.groupby(keys, observed=True, sort=False)
+            .first()
+            .reset_index()[columns]
+        )
+
+    print(f"Raw ingestion: {len(df)} rows from {len(paths)} files")
+    return df
+
+
+def prepare_data(
+    input_path,
+    output_path,
+    drop_na=True,
+    fill_method=None,
+    save_cleaned=True,
+    parquet_dir=None,
+    iso3_lookup_path=ISO3_LOOKUP_PATH,
+    max_workers=None,
+    use_processes=False,
+    appended_paths=()
+):
+    """
+    Cleans the raw data: renames columns, filters years, adds ISO3 codes
+    and handles missing critical values.
+
+    input_path: CSV file, DataFrame, or several raw files as a list,
+    glob pattern or directory (parsed in parallel with max_workers
+    threads, or processes with use_processes=True, see
+    read_raw_files). Rows are sorted once at the end.
+
+    appended_paths: raw files of rows added later with an incremental
+    update (see src.incremental), applied in order; a row replaces the
+    raw row with the same (Country_ID, Year) as a whole.
+    """
+
+    files = raw_input_files(input_path)
+
+    if files is not None:
+        df = read_raw_files(files, max_workers=max_workers, use_processes=use_processes)
+    else:
+        df = _read_raw(input_path)
+
+    if appended_paths:
+        df = pd.concat([df] + [_read_raw(path) for path in appended_paths], ignore_index=True)
+        df = apply_schema(df.drop_duplicates(["Country_ID", "Year"], keep="last"))
 
     # -----------------------------
     # ISO3
     # -----------------------------
-    import pycountry
-    def to_iso3(country_name):
-        try:
-            return pycountry.countries.lookup(country_name).alpha_3
-        except:
-            return None
-
-    df["Country_ISO3"] = df["Country"].apply(to_iso3)
+    df = add_iso3_column(df, lookup_path=iso3_lookup_path)
+    df = apply_schema(df)
 
     # -----------------------------
     # Missing values
     # -----------------------------
-    critical_cols = ['GDP', 'Inflation_CPI', 'Unemployment_Rate']
+    critical_cols = CRITICAL_COLUMNS
 
     if drop_na:
+        rows_before = len(df)
         df.dropna(subset=critical_cols, inplace=True)
+        add_stage_metric("nan_rows_dropped", rows_before - len(df))
 
     if fill_method:
         df[critical_cols] = df[critical_cols].fillna(method=fill_method)
@@ -60,10 +184,89 @@ def prepare_data(input_path, output_path, drop_na=True, fill_method=None, save_c
     df.reset_index(drop=True, inplace=True)
 
     if save_cleaned:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_csv(output_path, index=False)
-        print(f"Cleaned data saved to: {output_path}")
+        save_frame(df, output_path, "Cleaned data")
+
+    if parquet_dir:
+        write_dataset(df, parquet_dir, partition_by="Year")
 
     return df
 
 
+
+
+# =================================================
+# Streaming ingestion (large raw files)
+# =================================================
+def prepare_data_chunked(
+    input_path,
+    parquet_dir,
+    chunksize=250_000,
+    drop_na=True,
+    partition_by="Year",
+    iso3_lookup_path=ISO3_LOOKUP_PATH
+):
+    """
+    Cleans a raw CSV chunk by chunk into a partitioned Parquet dataset.
+
+    Each chunk goes through the same rename, year filter, ISO3 mapping
+    and critical-column filter as prepare_data and is appended to
+    parquet_dir, so peak memory depends on chunksize, not on the file
+    size. Country names are resolved to ISO3 once across all chunks.
+
+    Differences to prepare_data:
+    - no fill_method (filling would need rows from neighbouring chunks)
+    - rows are not globally sorted; readers sort by (Country_ID, Year)
+
+    Returns a dict with chunk and row counts.
+    """
+
+    iso3_by_name = {}
+    stats = {"chunks": 0, "rows_in": 0, "rows_out": 0}
+
+    reader = pd.read_csv(
+        input_path,
+        usecols=lambda col: col in COLUMN_RENAMES,
+        dtype=RAW_DTYPES,
+        chunksize=chunksize
+    )
+
+    for chunk in reader:
+        stats["chunks"] += 1
+        stats["rows_in"] += len(chunk)
+
+        chunk = _standardize(chunk)
+
+        new_names = [name for name in chunk["Country"].dropna().unique() if name not in iso3_by_name]
+        if new_names:
+            mapping, _ = resolve_iso3(new_names, lookup_path=iso3_lookup_path)
+            iso3_by_name.update(mapping)
+
+        chunk["Country_ISO3"] = chunk["Country"].map(iso3_by_name)
+        chunk = apply_schema(chunk)
+
+        if drop_na:
+            rows_before = len(chunk)
+            chunk = chunk.dropna(subset=CRITICAL_COLUMNS)
+            add_stage_metric("nan_rows_dropped", rows_before - len(chunk))
+
+        if chunk.empty:
+            continue
+
+        write_dataset(
+            chunk,
+            parquet_dir,
+            partition_by=partition_by,
+            existing="overwrite" if stats["rows_out"] == 0 else "append",
+            verbose=False
+        )
+        stats["rows_out"] += len(chunk)
+
+    unresolved = sorted(name for name, iso3 in iso3_by_name.items() if iso3 is None)
+    report_unresolved(unresolved, lookup_path=iso3_lookup_path)
+
+    print(
+        f"Chunked ingestion: {stats['rows_out']} of {stats['rows_in']} rows "
+        f"from {stats['chunks']} chunks saved to: {parquet_dir}"
+    )
+
+    return stats
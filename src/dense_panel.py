@@ -0,0 +1,216 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import add_stage_metric, file_size
+from src.schema import apply_schema
+
+
+# -----------------------------
+# Bundle layout
+# -----------------------------
+BUNDLE_VALUES = "values.npy"      # float64 [country, year, indicator]
+BUNDLE_PRESENT = "present.npy"    # bool [country, year], row exists in the long data
+BUNDLE_META = "meta.json"         # country ids / names, years, indicators
+
+
+def is_dense_panel(path):
+    return isinstance(path, str) and os.path.isfile(os.path.join(path, BUNDLE_VALUES))
+
+
+# =================================================
+# Long -> dense conversion
+# =================================================
+def build_dense_panel(df, indicators=None):
+    """
+    Converts a long (Country_ID, Year, ...) panel to a dense 3-D array.
+
+    - axis 0: countries sorted by Country_ID
+    - axis 1: every year from the first to the last one (gaps stay NaN,
+      so the time axis is regular)
+    - axis 2: indicators (default: every numeric column except Year)
+
+    Returns a DensePanel held in memory.
+    """
+
+    df = apply_schema(df)
+
+    if indicators is None:
+        indicators = [
+            col for col in df.select_dtypes("number").columns
+            if col != "Year"
+        ]
+
+    country_codes, country_ids = pd.factorize(df["Country_ID"].astype(str), sort=True)
+    names = (
+        df.assign(_code=country_codes)
+        .drop_duplicates("_code")
+        .set_index("_code")["Country"]
+        .sort_index()
+        .astype(str)
+        .tolist()
+    )
+
+    year_values = df["Year"].to_numpy()
+    first_year = int(year_values.min())
+    years = np.arange(first_year, int(year_values.max()) + 1, dtype=np.int16)
+    year_codes = year_values - first_year
+
+    values = np.full((len(country_ids), len(years), len(indicators)), np.nan)
+    values[country_codes, year_codes] = df[indicators].to_numpy(dtype=float)
+
+    present = np.zeros((len(country_ids), len(years)), dtype=bool)
+    present[country_codes, year_codes] = True
+
+    return DensePanel(values, present, list(country_ids), names, years, list(indicators))
+
+
+def save_dense_panel(panel, bundle_dir):
+    """
+    Writes a DensePanel as a directory of .npy files plus meta.json,
+    readable with load_dense_panel without parsing.
+    """
+
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    np.save(os.path.join(bundle_dir, BUNDLE_VALUES), panel.values)
+    np.save(os.path.join(bundle_dir, BUNDLE_PRESENT), panel.present)
+
+    meta = {
+        "country_ids": panel.country_ids,
+        "country_names": panel.country_names,
+        "years": [int(year) for year in panel.years],
+        "indicators": panel.indicators,
+    }
+    with open(os.path.join(bundle_dir, BUNDLE_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    add_stage_metric("bytes_written", file_size(bundle_dir))
+    print(f"Dense panel saved to: {bundle_dir} {panel.values.shape}")
+
+
+def load_dense_panel(bundle_dir, mmap_mode="r"):
+    """
+    Opens a bundle written by save_dense_panel. With mmap_mode="r" the
+    arrays are memory-mapped: opening is instant and slices are read
+    from disk on access.
+    """
+
+    with open(os.path.join(bundle_dir, BUNDLE_META), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    return DensePanel(
+        np.load(os.path.join(bundle_dir, BUNDLE_VALUES), mmap_mode=mmap_mode),
+        np.load(os.path.join(bundle_dir, BUNDLE_PRESENT), mmap_mode=mmap_mode),
+        meta["country_ids"],
+        meta["country_names"],
+        np.array(meta["years"], dtype=np.int16),
+        meta["indicators"]
+    )
+
+
+def write_dense_panel(input_path, bundle_dir, indicators=None):
+    """
+    Builds the dense panel of a long dataset and saves it to bundle_dir.
+    """
+
+    from src.io_utils import load_frame
+
+    panel = build_dense_panel(load_frame(input_path), indicators=indicators)
+    save_dense_panel(panel, bundle_dir)
+    return panel
+
+
+# =================================================
+# Dense panel
+# =================================================
+class DensePanel:
+    """
+    country x year x indicator array with its index vectors.
+
+    - country(country_id): [year, indicator] view
+    - indicator(name): [country, year] view, e.g. for vectorized math
+      along the time axis of every country at once
+    - cross_section(year): [country, indicator] view
+    - select(columns, filters): long DataFrame of the present cells,
+      used by src.io_utils.load_frame
+
+    All lookups are views into values (memory-mapped when loaded with
+    load_dense_panel), nothing is copied until the data is used.
+    """
+
+    def __init__(self, values, present, country_ids, country_names, years, indicators):
+        self.values = values
+        self.present = present
+        self.country_ids = list(country_ids)
+        self.country_names = list(country_names)
+        self.years = years
+        self.indicators = list(indicators)
+
+        self._country_pos = {country_id: i for i, country_id in enumerate(self.country_ids)}
+        self._indicator_pos = {name: i for i, name in enumerate(self.indicators)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _year_pos(self, year):
+        pos = int(year) - int(self.years[0])
+        if not 0 <= pos < len(self.years):
+            raise KeyError(year)
+        return pos
+
+    def country(self, country_id):
+        return self.values[self._country_pos[str(country_id)]]
+
+    def indicator(self, name):
+        return self.values[:, :, self._indicator_pos[name]]
+
+    def cross_section(self, year):
+        return self.values[:, self._year_pos(year)]
+
+    def select(self, columns=None, filters=None):
+        """
+        Long DataFrame (Country_ID, Country, Year + indicators) of the
+        cells that exist in the source data. Country_ID / Year equality
+        and "in" filters pick array positions directly.
+        Returns (frame, remaining_filters).
+        """
+
+        country_pos = np.arange(len(self.country_ids))
+        year_pos = np.arange(len(self.years))
+        remaining = []
+
+        for col, op, value in filters or []:
+            wanted = [value] if op == "==" else value
+            if col == "Country_ID" and op in ("==", "in"):
+                country_pos = np.intersect1d(country_pos, [
+                    self._country_pos[str(v)] for v in wanted if str(v) in self._country_pos
+                ]).astype(int)
+            elif col == "Year" and op in ("==", "in"):
+                offsets = np.asarray(wanted, dtype=int) - int(self.years[0])
+                year_pos = np.intersect1d(year_pos, offsets).astype(int)
+            else:
+                remaining.append((col, op, value))
+
+        indicators = [col for col in (columns or self.indicators) if col in self._indicator_pos]
+
+        present = self.present[np.ix_(country_pos, year_pos)]
+        c_idx, y_idx = np.nonzero(present)
+        rows_c = country_pos[c_idx]
+        rows_y = year_pos[y_idx]
+
+        df = pd.DataFrame({
+            "Country_ID": np.asarray(self.country_ids, dtype=object)[rows_c],
+            "Country": np.asarray(self.country_names, dtype=object)[rows_c],
+            "Year": self.years[rows_y],
+        })
+        for name in indicators:
+            df[name] = self.values[rows_c, rows_y, self._indicator_pos[name]]
+
+        if columns:
+            df = df[[col for col in columns if col in df.columns]]
+
+        return apply_schema(df), remaining
@@ -1,7 +1,14 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import os
+
+from src.features import pct_change, rolling_moments
+from src.global_aggregates import (
+    global_trend_state,
+    global_trends_from_state,
+    merge_global_trend_states,
+)
+from src.io_utils import iter_frames, load_frame, save_frame
+from src.panel_ops import group_boundaries, rows_from_end
+from src.storage import write_dataset
 
 
 # =================================================
@@ -19,10 +26,12 @@ def create_country_summary(input_path, output_path):
     - Min Inflation
     """
 
-    df = pd.read_csv(input_path)
+    columns = ["Country_ID", "Country", "Inflation_CPI", "GDP", "Unemployment_Rate"]
+
+    df = load_frame(input_path, columns=columns)
 
     summary_df = (
-        df.groupby("Country_ID")
+        df.groupby("Country_ID", observed=True)
         .agg(
             country_name=("Country", "first"),
             avg_inflation=("Inflation_CPI", "mean"),
@@ -34,65 +43,62 @@ def create_country_summary(input_path, output_path):
         .reset_index()
     )
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    summary_df.to_csv(output_path, index=False)
-
-    print(f"Country summary saved to: {output_path}")
+    save_frame(summary_df, output_path, "Country summary")
     return summary_df
 
 
 # =================================================
 # Feature Engineering (Intermediate Dataset)
 # =================================================
-def create_intermediate_dataset(input_path, output_path, rolling_window=5):
+def add_time_series_features(df, rolling_window=5):
     """
-    Creates an enriched time-series dataset with derived economic indicators.
+    Adds the derived time-series columns to a frame sorted by
+    (Country_ID, Year):
+    GDP_growth_pct, Inflation_pct_change, GDP_rolling_avg,
+    Inflation_rolling_avg.
 
-    Features:
-    - GDP growth rate (pct_change)
-    - Inflation change
-    - Rolling averages for GDP and Inflation
+    Both indicators go through the vectorized kernels of src.features
+    in one pass (no per-feature groupby / realignment).
     """
 
-    df = pd.read_csv(input_path)
+    starts, _, group_idx = group_boundaries(df["Country_ID"])
+    values = df[["GDP", "Inflation_CPI"]].to_numpy(dtype=float)
 
+    # GDP growth rate and inflation change (%)
+    change = pct_change(values, starts, group_idx)
+    df["GDP_growth_pct"] = change[:, 0]
+    df["Inflation_pct_change"] = change[:, 1]
 
-    df["Year"] = df["Year"].astype(int)
+    # Rolling averages (trend indicators)
+    rolling_avg, _ = rolling_moments(values, starts, group_idx, rolling_window)
+    df["GDP_rolling_avg"] = rolling_avg[:, 0]
+    df["Inflation_rolling_avg"] = rolling_avg[:, 1]
 
+    return df
 
-    df = df.sort_values(["Country_ID", "Year"])
 
-    # GDP growth rate (%)
-    df["GDP_growth_pct"] = (
-        df.groupby("Country_ID")["GDP"]
-        .pct_change() * 100
-    )
+def create_intermediate_dataset(input_path, output_path, rolling_window=5, parquet_dir=None):
+    """
+    Creates an enriched time-series dataset with derived economic indicators.
 
-    # Inflation change (%)
-    df["Inflation_pct_change"] = (
-        df.groupby("Country_ID")["Inflation_CPI"]
-        .pct_change() * 100
-    )
+    Features:
+    - GDP growth rate (pct_change)
+    - Inflation change
+    - Rolling averages for GDP and Inflation
 
-    # Rolling averages (trend indicators)
-    df["GDP_rolling_avg"] = (
-        df.groupby("Country_ID")["GDP"]
-        .rolling(window=rolling_window, min_periods=1)
-        .mean()
-        .reset_index(level=0, drop=True)
-    )
+    When parquet_dir is given the result is also stored as a
+    Year-partitioned Parquet dataset (see src.storage).
+    """
 
-    df["Inflation_rolling_avg"] = (
-        df.groupby("Country_ID")["Inflation_CPI"]
-        .rolling(window=rolling_window, min_periods=1)
-        .mean()
-        .reset_index(level=0, drop=True)
-    )
+    df = load_frame(input_path)
+    df = df.sort_values(["Country_ID", "Year"])
+    df = add_time_series_features(df, rolling_window=rolling_window)
+
+    save_frame(df, output_path, "Intermediate dataset")
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    if parquet_dir:
+        write_dataset(df, parquet_dir, partition_by="Year")
 
-    print(f"Intermediate dataset saved to: {output_path}")
     return df
 
 
@@ -111,111 +117,96 @@ def compute_country_trends(input_path, output_path, recent_years=5):
     - Mean inflation rate
     - Inflation trend direction
     - Number of crisis years (negative GDP growth)
+
+    All metrics come from one grouping of the panel sorted by
+    (Country_ID, Year); first/last/tail values are taken at the group
+    boundaries instead of per-group Python functions.
     """
 
-    df = pd.read_csv(input_path)
-    df["Year"] = pd.to_datetime(df["Year"])
+    # GDP_growth_pct is optional (recomputed from GDP when missing)
+    columns = ["Country_ID", "Country", "Year", "GDP", "GDP_growth_pct", "Inflation_CPI"]
+
+    df = load_frame(input_path, columns=columns)
     df = df.sort_values(["Country_ID", "Year"])
 
-    country_names = (
-        df.groupby("Country_ID")["Country"]
-        .first()
-        .rename("Country")
-    )
+    # Group boundaries of the sorted panel
+    starts, ends, group_idx = group_boundaries(df["Country_ID"])
 
-    # GDP growth rate
-    df["GDP_growth_pct"] = (
-        df.groupby("Country_ID")["GDP"]
-        .pct_change() * 100
-    )
+    # GDP growth rate (reused from the intermediate dataset when present)
+    if "GDP_growth_pct" in df.columns:
+        growth = df["GDP_growth_pct"].to_numpy(dtype=float)
+    else:
+        gdp = df["GDP"].to_numpy(dtype=float)
+        growth = (gdp / np.r_[np.nan, gdp[:-1]] - 1) * 100
+        growth[starts] = np.nan
 
-    # Mean GDP growth (recent years)
-    mean_recent_growth = (
-        df.groupby("Country_ID")
-        .tail(recent_years)
-        .groupby("Country_ID")["GDP_growth_pct"]
-        .mean()
-        .rename("mean_gdp_growth_last_years")
-    )
+    # Only the last N rows of each country count towards recent growth
+    position_from_end = rows_from_end(ends, group_idx)
 
-    # GDP volatility (economic stability indicator)
-    gdp_volatility = (
-        df.groupby("Country_ID")["GDP"]
-        .std()
-        .rename("gdp_volatility_std")
-    )
+    df["_recent_growth"] = np.where(position_from_end < recent_years, growth, np.nan)
+    df["_crisis_year"] = growth < 0
 
-    # Mean inflation
-    inflation_mean = (
-        df.groupby("Country_ID")["Inflation_CPI"]
-        .mean()
-        .rename("mean_inflation")
+    trends_df = (
+        df.groupby("Country_ID", sort=False, observed=True)
+        .agg(
+            Country=("Country", "first"),
+            mean_gdp_growth_last_years=("_recent_growth", "mean"),
+            gdp_volatility_std=("GDP", "std"),
+            mean_inflation=("Inflation_CPI", "mean"),
+            crisis_year_count=("_crisis_year", "sum"),
+        )
     )
 
     # Inflation trend direction (simple slope approximation)
-    inflation_trend_value = (
-        df.groupby("Country_ID")["Inflation_CPI"]
-        .apply(lambda x: x.iloc[-1] - x.iloc[0])
+    inflation = df["Inflation_CPI"].to_numpy(dtype=float)
+    trend_value = inflation[ends] - inflation[starts]
+    trends_df["inflation_trend_direction"] = np.where(trend_value > 0, "Upward", "Downward")
+
+    # Countries without crisis years stay empty, as before
+    trends_df["crisis_year_count"] = (
+        trends_df["crisis_year_count"]
+        .where(trends_df["crisis_year_count"] > 0)
+        .astype(float)
     )
 
-    inflation_trend_direction = (
-        inflation_trend_value
-        .apply(lambda x: "Upward" if x > 0 else "Downward")
-        .rename("inflation_trend_direction")
-    )
-
-    # Crisis years count (negative GDP growth)
-    crisis_year_count = (
-        df[df["GDP_growth_pct"] < 0]
-        .groupby("Country_ID")
-        .size()
-        .rename("crisis_year_count")
-    )
+    trends_df = trends_df[[
+        "Country",
+        "mean_gdp_growth_last_years",
+        "gdp_volatility_std",
+        "mean_inflation",
+        "inflation_trend_direction",
+        "crisis_year_count",
+    ]].reset_index(drop=True)
 
-    # Combine all indicators
-    trends_df = pd.concat(
-        [
-            country_names,
-            mean_recent_growth,
-            gdp_volatility,
-            inflation_mean,
-            inflation_trend_direction,
-            crisis_year_count,
-        ],
-        axis=1
-    ).reset_index(drop=True)
-
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    trends_df.to_csv(output_path, index=False)
-
-    print(f"Country trends saved to: {output_path}")
+    save_frame(trends_df, output_path, "Country trends")
     return trends_df
 
 
 # =================================================
 # Global Trend Analysis
 # =================================================
-def analyze_global_trends(input_path, output_path):
-    df = pd.read_csv(input_path)
+def analyze_global_trends(input_path, output_path, chunksize=None):
+    """
+    Computes yearly global trends from mergeable per-year state
+    (see src.global_aggregates).
+
+    Metrics per year, for inflation and GDP growth:
+    - mean (global_mean_inflation, mean_global_gdp_growth) and std
+    - GDP-weighted mean
+    - median and p10 / p90 bands, robust to hyperinflation outliers
 
-    # Year must be integer
-    df["Year"] = df["Year"].astype(int)
+    With chunksize the input is aggregated chunk by chunk and never
+    held in memory whole.
+    """
 
-    # Sort by year
-    df = df.sort_values("Year")
+    columns = ["Year", "GDP", "Inflation_CPI", "GDP_growth_pct"]
 
-    global_df = (
-        df.groupby("Year")
-        .agg(
-            global_mean_inflation=("Inflation_CPI", "mean"),
-            mean_global_gdp_growth=("GDP_growth_pct", "mean")
-        )
-        .reset_index()
-    )
+    state = None
+    for chunk in iter_frames(input_path, columns=columns, chunksize=chunksize):
+        state = merge_global_trend_states(state, global_trend_state(chunk))
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    global_df.to_csv(output_path, index=False)
+    global_df = global_trends_from_state(state)
 
-    print(f"Global trends saved to: {output_path}")
+    save_frame(global_df, output_path, "Global trends")
 
     return global_df
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from src.io_utils import load_frame
+from src.panel_ops import group_boundaries
+from src.schema import INDICATOR_COLUMNS
+from src.storage import write_dataset
+
+
+FEATURE_WINDOWS = (3, 5, 10)
+FEATURE_LAGS = (1,)
+
+
+# =================================================
+# Vectorized per-country kernels
+# =================================================
+# All kernels take a 2-D float array (rows x indicators) of a panel
+# sorted by (Country_ID, Year) plus its group boundaries, and never
+# mix values across countries.
+def _positions(starts, group_idx):
+    """
+    Row position inside its group (0 = first year of the country).
+    """
+
+    return np.arange(len(group_idx)) - starts[group_idx]
+
+
+def lag(values, starts, group_idx, periods=1):
+    shifted = np.full_like(values, np.nan)
+    shifted[periods:] = values[:-periods]
+    shifted[_positions(starts, group_idx) < periods] = np.nan
+    return shifted
+
+
+def pct_change(values, starts, group_idx, periods=1):
+    """
+    Percent change (x_t / x_t-periods - 1) * 100; NaN when either value
+    is missing, like pandas pct_change(fill_method=None).
+    """
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (values / lag(values, starts, group_idx, periods) - 1) * 100
+
+
+def rolling_moments(values, starts, group_idx, window, min_periods=1):
+    """
+    Trailing rolling mean and sample std (ddof=1) over `window` rows,
+    ignoring NaNs, like groupby().rolling(window, min_periods).
+
+    Window sums are differences of one cumulative sum over the whole
+    panel; the lower bound of every window is clipped at its country's
+    first row. Values are first standardized with their country's mean
+    and spread, so the running sums stay O(rows) whatever the level of
+    the indicator and the variance does not cancel out.
+
+    Returns (mean, std).
+    """
+
+    n_rows = len(values)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    group_n = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        group_mean = np.add.reduceat(filled, starts, axis=0) / group_n
+    group_mean = np.nan_to_num(group_mean)[group_idx]
+
+    centred = np.where(valid, values - group_mean, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        group_scale = np.sqrt(np.add.reduceat(centred * centred, starts, axis=0) / group_n)
+    group_scale = np.where(group_scale > 0, group_scale, 1.0)[group_idx]
+
+    centred /= group_scale
+
+    def cumulative(x):
+        out = np.zeros((n_rows + 1,) + x.shape[1:])
+        np.cumsum(x, axis=0, out=out[1:])
+        return out
+
+    c_n = cumulative(valid.astype(float))
+    c_1 = cumulative(centred)
+    c_2 = cumulative(centred * centred)
+
+    hi = np.arange(1, n_rows + 1)
+    lo = np.maximum(hi - window, starts[group_idx])
+
+    count = c_n[hi] - c_n[lo]
+    s_1 = c_1[hi] - c_1[lo]
+    s_2 = c_2[hi] - c_2[lo]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count >= max(min_periods, 1), group_mean + group_scale * s_1 / count, np.nan)
+        var = group_scale * group_scale * (s_2 - s_1 * s_1 / count) / (count - 1)
+        std = np.where(count >= max(min_periods, 2), np.sqrt(np.clip(var, 0, None)), np.nan)
+
+    return mean, std
+
+
+# =================================================
+# Feature engine
+# =================================================
+def compute_features(df, indicators=None, windows=FEATURE_WINDOWS, lags=FEATURE_LAGS):
+    """
+    Computes the feature set for every indicator of a panel sorted by
+    (Country_ID, Year) in one vectorized pass.
+
+    Per indicator:
+    - <col>_pct_change: percent change to the previous year
+    - <col>_roll_mean_<w>, <col>_roll_std_<w>: trailing rolling mean
+      and std (min_periods=1) for every window w
+    - <col>_lag_<l>: value l years earlier
+
+    Returns a DataFrame of the feature columns, aligned with df.
+    """
+
+    indicators = [col for col in (indicators or INDICATOR_COLUMNS) if col in df.columns]
+
+    starts, _, group_idx = group_boundaries(df["Country_ID"])
+    values = df[indicators].to_numpy(dtype=float)
+
+    blocks = {"pct_change": pct_change(values, starts, group_idx)}
+
+    for window in windows:
+        mean, std = rolling_moments(values, starts, group_idx, window)
+        blocks[f"roll_mean_{window}"] = mean
+        blocks[f"roll_std_{window}"] = std
+
+    for periods in lags:
+        blocks[f"lag_{periods}"] = lag(values, starts, group_idx, periods)
+
+    columns = {
+        f"{col}_{suffix}": block[:, i]
+        for i, col in enumerate(indicators)
+        for suffix, block in blocks.items()
+    }
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def create_feature_dataset(
+    input_path,
+    parquet_dir,
+    indicators=None,
+    windows=FEATURE_WINDOWS,
+    lags=FEATURE_LAGS
+):
+    """
+    Builds the wide feature dataset (keys + indicators + all features
+    of compute_features) and stores it as a Year-partitioned Parquet
+    dataset (see src.storage).
+    """
+
+    df = load_frame(input_path)
+    df = df.sort_values(["Country_ID", "Year"]).reset_index(drop=True)
+
+    features_df = pd.concat(
+        [df, compute_features(df, indicators=indicators, windows=windows, lags=lags)],
+        axis=1
+    )
+
+    if parquet_dir:
+        write_dataset(features_df, parquet_dir, partition_by="Year")
+
+    return features_df
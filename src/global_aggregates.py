@@ -0,0 +1,291 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Aggregated indicators
+# -----------------------------
+# output prefix -> panel column
+GLOBAL_INDICATORS = {
+    "inflation": "Inflation_CPI",
+    "gdp_growth": "GDP_growth_pct",
+}
+
+WEIGHT_COLUMN = "GDP"
+
+QUANTILES = {"p10": 0.1, "median": 0.5, "p90": 0.9}
+
+# relative error of the sketch quantiles
+SKETCH_ACCURACY = 0.01
+
+STATE_MOMENTS = "global_moments.csv"
+STATE_SKETCH = "global_sketch.csv"
+
+MOMENT_KEYS = ["Year", "indicator"]
+SKETCH_KEYS = ["Year", "indicator", "sign", "bucket"]
+
+
+# =================================================
+# Quantile sketch (log-spaced buckets)
+# =================================================
+# Every value x is counted in the bucket ceil(log_gamma(|x|)) of its
+# sign, gamma = (1 + a) / (1 - a). Any value in a bucket is within a
+# relative error a of the bucket's representative value, and sketches
+# merge by adding bucket counts - independent of the order and the
+# partitioning of the input.
+def _gamma(accuracy):
+    return (1 + accuracy) / (1 - accuracy)
+
+
+def _bucket_of(values, accuracy):
+    with np.errstate(divide="ignore"):
+        bucket = np.ceil(np.log(np.abs(values)) / np.log(_gamma(accuracy)))
+    return np.where(values == 0, 0, bucket).astype(np.int64)
+
+
+def _bucket_value(sign, bucket, accuracy):
+    gamma = _gamma(accuracy)
+    return sign * 2 * gamma ** bucket.astype(float) / (gamma + 1)
+
+
+# =================================================
+# Mergeable state
+# =================================================
+def global_trend_state(df, accuracy=SKETCH_ACCURACY):
+    """
+    Per-year partial aggregates of one chunk / shard of the panel.
+
+    Returns a dict of two DataFrames:
+    - "moments": per (Year, indicator) n, sum, sum_sq, min, max and the
+      GDP-weighted sums (weight_sum, weighted_sum)
+    - "sketch": per (Year, indicator, sign, bucket) value counts
+
+    States of different chunks are combined with
+    merge_global_trend_states; the result does not depend on how the
+    panel was split.
+    """
+
+    moments, sketches = [], []
+    weights = df[WEIGHT_COLUMN].to_numpy(dtype=float) if WEIGHT_COLUMN in df.columns else None
+
+    for name, col in GLOBAL_INDICATORS.items():
+        if col not in df.columns:
+            continue
+
+        values = df[col].to_numpy(dtype=float)
+        valid = np.isfinite(values)
+
+        part = pd.DataFrame({
+            "Year": df["Year"].to_numpy()[valid],
+            "x": values[valid],
+        })
+        part["x_sq"] = part["x"] ** 2
+
+        if weights is not None:
+            w = weights[valid]
+            w = np.where(np.isfinite(w) & (w > 0), w, 0.0)
+            part["w"] = w
+            part["wx"] = w * part["x"]
+        else:
+            part["w"] = 0.0
+            part["wx"] = 0.0
+
+        grouped = part.groupby("Year")
+        moments.append(
+            grouped.agg(
+                n=("x", "size"),
+                sum=("x", "sum"),
+                sum_sq=("x_sq", "sum"),
+                min=("x", "min"),
+                max=("x", "max"),
+                weight_sum=("w", "sum"),
+                weighted_sum=("wx", "sum"),
+            )
+            .reset_index()
+            .assign(indicator=name)
+        )
+
+        part["sign"] = np.sign(part["x"]).astype(np.int8)
+        part["bucket"] = _bucket_of(part["x"].to_numpy(), accuracy)
+        sketches.append(
+            part.groupby(["Year", "sign", "bucket"])
+            .size()
+            .rename("count")
+            .reset_index()
+            .assign(indicator=name)
+        )
+
+    state = {
+        "moments": pd.concat(moments, ignore_index=True) if moments else _empty_moments(),
+        "sketch": pd.concat(sketches, ignore_index=True) if sketches else _empty_sketch(),
+        "accuracy": accuracy,
+    }
+    return _normalize(state)
+
+
+def _empty_moments():
+    return pd.DataFrame(columns=MOMENT_KEYS + [
+        "n", "sum", "sum_sq", "min", "max", "weight_sum", "weighted_sum"
+    ])
+
+
+def _empty_sketch():
+    return pd.DataFrame(columns=SKETCH_KEYS + ["count"])
+
+
+def _normalize(state):
+    moments = state["moments"]
+    sketch = state["sketch"]
+
+    state["moments"] = (
+        moments[MOMENT_KEYS + [col for col in moments.columns if col not in MOMENT_KEYS]]
+        .sort_values(MOMENT_KEYS)
+        .reset_index(drop=True)
+    )
+    state["sketch"] = (
+        sketch[SKETCH_KEYS + ["count"]]
+        .sort_values(SKETCH_KEYS)
+        .reset_index(drop=True)
+    )
+    return state
+
+
+def merge_global_trend_states(*states):
+    """
+    Combines states built by global_trend_state (chunks, shards,
+    parallel workers or an earlier run plus new rows).
+    """
+
+    states = [state for state in states if state is not None]
+    accuracy = states[0]["accuracy"]
+
+    if any(state["accuracy"] != accuracy for state in states):
+        raise ValueError("Cannot merge global trend states with different sketch accuracy")
+
+    moments = (
+        pd.concat([state["moments"] for state in states], ignore_index=True)
+        .groupby(MOMENT_KEYS)
+        .agg(
+            n=("n", "sum"),
+            sum=("sum", "sum"),
+            sum_sq=("sum_sq", "sum"),
+            min=("min", "min"),
+            max=("max", "max"),
+            weight_sum=("weight_sum", "sum"),
+            weighted_sum=("weighted_sum", "sum"),
+        )
+        .reset_index()
+    )
+
+    sketch = (
+        pd.concat([state["sketch"] for state in states], ignore_index=True)
+        .groupby(SKETCH_KEYS)["count"]
+        .sum()
+        .reset_index()
+    )
+
+    return _normalize({"moments": moments, "sketch": sketch, "accuracy": accuracy})
+
+
+# =================================================
+# Final trends
+# =================================================
+def _sketch_quantiles(sketch, accuracy):
+    """
+    Quantile estimates per (Year, indicator) from the bucket counts.
+    """
+
+    sketch = sketch.copy()
+
+    # buckets in value order: negatives by descending bucket, zero, positives
+    sketch["_order"] = sketch["sign"] * sketch["bucket"]
+    sketch = sketch.sort_values(["Year", "indicator", "sign", "_order"])
+
+    grouped = sketch.groupby(MOMENT_KEYS)
+    sketch["_cum"] = grouped["count"].cumsum()
+    sketch["_n"] = grouped["count"].transform("sum")
+    sketch["_value"] = _bucket_value(sketch["sign"], sketch["bucket"], accuracy)
+
+    result = sketch[MOMENT_KEYS].drop_duplicates().set_index(MOMENT_KEYS)
+
+    for name, q in QUANTILES.items():
+        # lower-rank convention: the value with rank floor(q * (n - 1))
+        rank = np.floor(q * (sketch["_n"] - 1))
+        hit = sketch[sketch["_cum"] > rank]
+        result[name] = hit.groupby(MOMENT_KEYS)["_value"].first()
+
+    return result
+
+
+def global_trends_from_state(state):
+    """
+    Global trends per year from a (merged) state.
+
+    Per indicator prefix (inflation, gdp_growth): mean, std,
+    gdp_weighted_mean, p10, median and p90. Quantiles come from the
+    sketch (relative error below the sketch accuracy), clipped to the
+    exact min / max. The legacy columns global_mean_inflation and
+    mean_global_gdp_growth are kept.
+    """
+
+    moments = state["moments"].set_index(MOMENT_KEYS)
+    quantiles = _sketch_quantiles(state["sketch"], state["accuracy"])
+
+    n = moments["n"].astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats = pd.DataFrame({
+            "mean": moments["sum"] / n,
+            "std": np.sqrt(
+                np.clip(moments["sum_sq"] - moments["sum"] ** 2 / n, 0, None)
+                / (n - 1).where(n > 1)
+            ),
+            "gdp_weighted_mean": (
+                moments["weighted_sum"] / moments["weight_sum"].where(moments["weight_sum"] > 0)
+            ),
+        })
+
+    for name in QUANTILES:
+        stats[name] = quantiles[name].reindex(stats.index).clip(moments["min"], moments["max"])
+
+    wide = stats.unstack("indicator")
+    wide.columns = [f"{indicator}_{stat}" for stat, indicator in wide.columns]
+
+    global_df = pd.DataFrame(index=wide.index)
+    global_df["global_mean_inflation"] = wide.get("inflation_mean")
+    global_df["mean_global_gdp_growth"] = wide.get("gdp_growth_mean")
+
+    for indicator in GLOBAL_INDICATORS:
+        for stat in ["std", "gdp_weighted_mean", "p10", "median", "p90"]:
+            col = f"{indicator}_{stat}"
+            if col in wide.columns:
+                global_df[col] = wide[col]
+
+    return global_df.reset_index()
+
+
+# =================================================
+# State persistence
+# =================================================
+def save_global_trend_state(state, state_dir):
+    os.makedirs(state_dir, exist_ok=True)
+
+    state["moments"].to_csv(os.path.join(state_dir, STATE_MOMENTS), index=False)
+    state["sketch"].assign(accuracy=state["accuracy"]).to_csv(
+        os.path.join(state_dir, STATE_SKETCH),
+        index=False
+    )
+
+
+def load_global_trend_state(state_dir):
+    moments = pd.read_csv(os.path.join(state_dir, STATE_MOMENTS))
+    sketch = pd.read_csv(os.path.join(state_dir, STATE_SKETCH))
+
+    accuracy = float(sketch["accuracy"].iloc[0]) if len(sketch) else SKETCH_ACCURACY
+
+    return _normalize({
+        "moments": moments,
+        "sketch": sketch.drop(columns="accuracy"),
+        "accuracy": accuracy,
+    })
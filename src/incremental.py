@@ -0,0 +1,349 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_preparation import prepare_data
+from src.economic_analysis import add_time_series_features
+from src.global_aggregates import (
+    global_trend_state,
+    global_trends_from_state,
+    load_global_trend_state,
+    merge_global_trend_states,
+    save_global_trend_state,
+)
+from src.io_utils import load_frame, save_frame, append_frame
+from src.schema import COLUMN_RENAMES, apply_schema, csv_dtypes
+from src.storage import write_dataset
+
+
+# -----------------------------
+# State files
+# -----------------------------
+STATE_META = "meta.json"
+STATE_TAIL = "tail_rows.csv"
+STATE_COUNTRY = "country_state.csv"
+
+TAIL_COLUMNS = ["Country_ID", "Year", "GDP", "Inflation_CPI", "GDP_growth_pct"]
+
+
+# =================================================
+# Mergeable aggregate state
+# =================================================
+def _country_state(df):
+    """
+    Per-country partial aggregates that can be merged with _merge_country_state.
+    df must be sorted by (Country_ID, Year).
+    """
+
+    grouped = df.groupby("Country_ID", observed=True)
+
+    state = grouped.agg(
+        Country=("Country", "first"),
+        inflation_n=("Inflation_CPI", "count"),
+        inflation_sum=("Inflation_CPI", "sum"),
+        inflation_max=("Inflation_CPI", "max"),
+        inflation_min=("Inflation_CPI", "min"),
+        inflation_first=("Inflation_CPI", "first"),
+        inflation_last=("Inflation_CPI", "last"),
+        gdp_n=("GDP", "count"),
+        gdp_sum=("GDP", "sum"),
+        gdp_mean=("GDP", "mean"),
+        unemployment_n=("Unemployment_Rate", "count"),
+        unemployment_sum=("Unemployment_Rate", "sum"),
+    )
+
+    gdp_dev = df["GDP"] - grouped["GDP"].transform("mean")
+    state["gdp_m2"] = (gdp_dev ** 2).groupby(df["Country_ID"], observed=True).sum()
+
+    state["crisis_n"] = (
+        (df["GDP_growth_pct"] < 0)
+        .groupby(df["Country_ID"], observed=True)
+        .sum()
+    )
+
+    return state
+
+
+def _merge_country_state(old, new):
+    """
+    Combines two per-country states; new covers later years than old.
+    GDP variance is merged with the parallel (Chan et al.) update.
+    """
+
+    countries = old.index.union(new.index)
+    old = old.reindex(countries)
+    new = new.reindex(countries)
+
+    merged = pd.DataFrame(index=countries)
+    merged["Country"] = old["Country"].fillna(new["Country"])
+
+    for col in ["inflation_n", "inflation_sum", "gdp_n", "gdp_sum",
+                "unemployment_n", "unemployment_sum", "crisis_n"]:
+        merged[col] = old[col].fillna(0) + new[col].fillna(0)
+
+    merged["inflation_max"] = np.fmax(old["inflation_max"], new["inflation_max"])
+    merged["inflation_min"] = np.fmin(old["inflation_min"], new["inflation_min"])
+    merged["inflation_first"] = old["inflation_first"].fillna(new["inflation_first"])
+    merged["inflation_last"] = new["inflation_last"].fillna(old["inflation_last"])
+
+    n_a = old["gdp_n"].fillna(0)
+    n_b = new["gdp_n"].fillna(0)
+    n = n_a + n_b
+    mean_a = old["gdp_mean"].fillna(0)
+    mean_b = new["gdp_mean"].fillna(0)
+    delta = mean_b - mean_a
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        merged["gdp_mean"] = np.where(n > 0, mean_a + delta * n_b / n, np.nan)
+        merged["gdp_m2"] = (
+            old["gdp_m2"].fillna(0)
+            + new["gdp_m2"].fillna(0)
+            + np.where(n > 0, delta ** 2 * n_a * n_b / n, 0)
+        )
+
+    merged.index.name = "Country_ID"
+    return merged
+
+
+def _tail_rows(df, n_rows):
+    return df.groupby("Country_ID", observed=True).tail(n_rows)[TAIL_COLUMNS]
+
+
+# =================================================
+# Outputs from state
+# =================================================
+def _summary_from_state(country_state):
+    state = country_state
+
+    summary_df = pd.DataFrame({
+        "country_name": state["Country"],
+        "avg_inflation": state["inflation_sum"] / state["inflation_n"],
+        "avg_gdp": state["gdp_sum"] / state["gdp_n"],
+        "avg_unemployment": state["unemployment_sum"] / state["unemployment_n"].replace(0, np.nan),
+        "max_inflation": state["inflation_max"],
+        "min_inflation": state["inflation_min"],
+    })
+
+    return summary_df.reset_index()
+
+
+def _trends_from_state(country_state, tail_df, recent_years):
+    state = country_state
+
+    mean_recent_growth = (
+        tail_df.groupby("Country_ID", observed=True)
+        .tail(recent_years)
+        .groupby("Country_ID", observed=True)["GDP_growth_pct"]
+        .mean()
+    )
+
+    trend_value = state["inflation_last"] - state["inflation_first"]
+
+    trends_df = pd.DataFrame({
+        "Country": state["Country"],
+        "mean_gdp_growth_last_years": mean_recent_growth.reindex(state.index),
+        "gdp_volatility_std": np.sqrt(state["gdp_m2"] / (state["gdp_n"] - 1).where(state["gdp_n"] > 1)),
+        "mean_inflation": state["inflation_sum"] / state["inflation_n"],
+        "inflation_trend_direction": np.where(trend_value > 0, "Upward", "Downward"),
+        # compute_country_trends leaves countries without crises empty
+        "crisis_year_count": state["crisis_n"].where(state["crisis_n"] > 0).astype(float),
+    })
+
+    return trends_df.reset_index(drop=True)
+
+
+# =================================================
+# State persistence
+# =================================================
+def _save_state(state_dir, meta, tail_df, country_state, global_state):
+    os.makedirs(state_dir, exist_ok=True)
+
+    with open(os.path.join(state_dir, STATE_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    tail_df.to_csv(os.path.join(state_dir, STATE_TAIL), index=False)
+    country_state.to_csv(os.path.join(state_dir, STATE_COUNTRY))
+    save_global_trend_state(global_state, state_dir)
+
+
+def _load_state(state_dir):
+    with open(os.path.join(state_dir, STATE_META), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    tail_df = pd.read_csv(os.path.join(state_dir, STATE_TAIL), dtype=csv_dtypes())
+    country_state = pd.read_csv(os.path.join(state_dir, STATE_COUNTRY), index_col="Country_ID")
+    global_state = load_global_trend_state(state_dir)
+
+    return meta, tail_df, country_state, global_state
+
+
+def build_incremental_state(input_path, state_dir, rolling_window=5, recent_years=5):
+    """
+    Builds the incremental-update state from a full intermediate dataset.
+
+    State:
+    - last max(rolling_window, recent_years) rows per country
+      (context for pct_change, rolling averages and recent growth)
+    - per-country mergeable aggregates (counts, sums, min/max,
+      first/last, GDP mean and M2)
+    - per-year global trend state (moments and quantile sketches,
+      see src.global_aggregates)
+    """
+
+    df = load_frame(input_path)
+    df = df.sort_values(["Country_ID", "Year"])
+
+    meta = {"rolling_window": rolling_window, "recent_years": recent_years}
+
+    _save_state(
+        state_dir,
+        meta,
+        _tail_rows(df, max(rolling_window, recent_years)),
+        _country_state(df),
+        global_trend_state(df)
+    )
+
+    print(f"Incremental state saved to: {state_dir}")
+
+
+# =================================================
+# Append-only update
+# =================================================
+def _archive_raw_rows(cleaned_df, archive_dir, source):
+    """
+    Saves the appended rows with the raw column names in archive_dir,
+    so a full re-run of prepare_data (which reads the raw dataset and
+    every file in archive_dir) keeps them.
+    """
+
+    raw_names = {col: raw for raw, col in COLUMN_RENAMES.items()}
+    raw_df = cleaned_df[[col for col in raw_names if col in cleaned_df.columns]].rename(columns=raw_names)
+
+    stem = os.path.splitext(os.path.basename(source))[0] if isinstance(source, str) else "appended"
+    path = os.path.join(archive_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{stem}.csv")
+
+    save_frame(raw_df, path, "Appended raw rows")
+    return path
+
+
+def apply_incremental_update(
+    new_rows_path,
+    state_dir,
+    rolling_window=5,
+    recent_years=5,
+    cleaned_path=None,
+    intermediate_path=None,
+    cleaned_parquet=None,
+    intermediate_parquet=None,
+    raw_archive_dir=None,
+    summary_path=None,
+    trends_path=None,
+    global_path=None
+):
+    """
+    Adds new raw rows (e.g. one newly published year) without touching
+    the full history.
+
+    - New rows are cleaned with prepare_data
+    - Derived features use only the stored tail rows of each country
+      as context
+    - country_summary, country_trends and global_trends are rebuilt from
+      the merged aggregate state
+
+    Rows that are not newer than the last stored year of their country
+    are dropped (append-only). Cost depends on the update size and the
+    number of countries, not on the length of the history.
+
+    The accepted rows are appended to the cleaned / intermediate CSVs
+    and Parquet datasets, and saved in raw form to raw_archive_dir
+    (see _archive_raw_rows) so a later full rebuild includes them.
+
+    Returns a dict with the new intermediate rows and the three outputs.
+    """
+
+    meta, tail_df, country_state, global_state = _load_state(state_dir)
+
+    if meta != {"rolling_window": rolling_window, "recent_years": recent_years}:
+        raise ValueError(
+            f"Incremental state in {state_dir} was built with {meta}; "
+            f"rebuild it or pass matching parameters"
+        )
+
+    new_df = prepare_data(new_rows_path, None, save_cleaned=False)
+
+    # --- append-only check ---
+    last_year = tail_df.groupby("Country_ID", observed=True)["Year"].max()
+    known_last = new_df["Country_ID"].map(last_year)
+    is_new = known_last.isna() | (new_df["Year"] > known_last)
+
+    if not is_new.all():
+        print(f"Skipped {(~is_new).sum()} rows that are not newer than the stored history")
+        new_df = new_df[is_new]
+
+    if new_df.empty:
+        print("No new rows to append")
+        return None
+
+    # --- features with tail context ---
+    context_df = tail_df.assign(_is_new=False)
+    new_df = new_df.assign(_is_new=True)
+
+    combined = apply_schema(pd.concat([context_df, new_df], ignore_index=True))
+    combined = combined.sort_values(["Country_ID", "Year"])
+    combined = add_time_series_features(combined, rolling_window=rolling_window)
+
+    inter_new = combined[combined["_is_new"]].drop(columns="_is_new")
+    inter_new = inter_new[list(new_df.columns.drop("_is_new")) + [
+        "GDP_growth_pct",
+        "Inflation_pct_change",
+        "GDP_rolling_avg",
+        "Inflation_rolling_avg",
+    ]]
+
+    # --- merge aggregate state ---
+    country_state = _merge_country_state(country_state, _country_state(inter_new))
+    global_state = merge_global_trend_states(global_state, global_trend_state(inter_new))
+
+    tail_df = apply_schema(pd.concat([tail_df, inter_new[TAIL_COLUMNS]], ignore_index=True))
+    tail_df = _tail_rows(
+        tail_df.sort_values(["Country_ID", "Year"]),
+        max(rolling_window, recent_years)
+    )
+
+    _save_state(state_dir, meta, tail_df, country_state, global_state)
+
+    # --- outputs ---
+    summary_df = _summary_from_state(country_state)
+    trends_df = _trends_from_state(country_state, tail_df, recent_years)
+    global_df = global_trends_from_state(global_state)
+
+    cleaned_new = new_df.drop(columns="_is_new")
+
+    append_frame(cleaned_new, cleaned_path, "Cleaned data")
+    append_frame(inter_new, intermediate_path, "Intermediate dataset")
+
+    for df, dataset_dir in [(cleaned_new, cleaned_parquet), (inter_new, intermediate_parquet)]:
+        if dataset_dir:
+            write_dataset(
+                df,
+                dataset_dir,
+                partition_by="Year",
+                existing="append"
+            )
+
+    if raw_archive_dir:
+        _archive_raw_rows(cleaned_new, raw_archive_dir, new_rows_path)
+
+    save_frame(summary_df, summary_path, "Country summary")
+    save_frame(trends_df, trends_path, "Country trends")
+    save_frame(global_df, global_path, "Global trends")
+
+    return {
+        "intermediate": inter_new,
+        "country_summary": summary_df,
+        "country_trends": trends_df,
+        "global_trends": global_df,
+    }
@@ -0,0 +1,137 @@
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# -----------------------------
+# Active stage (for metrics reported from inside src functions)
+# -----------------------------
+_ACTIVE = []
+
+
+def add_stage_metric(key, value):
+    """
+    Adds value to metric `key` of the stage currently being measured.
+    No-op outside measure_stage, so src functions can call it freely.
+    """
+
+    if _ACTIVE:
+        metrics = _ACTIVE[-1]
+        metrics[key] = metrics.get(key, 0) + value
+
+
+def file_size(path):
+    """
+    Size in bytes of a file, or of all files below a directory.
+    """
+
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(path)
+            for name in names
+        )
+
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    return round(peak / divisor, 1)
+
+
+def _cpu_seconds():
+    times = os.times()
+    # includes finished child processes (e.g. the chart render pool)
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def count_rows(obj):
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    return None
+
+
+# =================================================
+# Stage measurement
+# =================================================
+@contextlib.contextmanager
+def measure_stage(name, run_log=None, profile_dir=None, run_id=None):
+    """
+    Measures one stage and appends a JSON line to run_log.
+
+    Recorded: wall and CPU seconds, process peak RSS after the stage
+    and how much the stage raised it, plus anything reported via
+    add_stage_metric (bytes_read, bytes_written, nan_rows_dropped, ...)
+    or set on the yielded dict (rows_in, rows_out).
+
+    With profile_dir, a cProfile dump is written to
+    <profile_dir>/<name>.prof (open with pstats or snakeviz).
+    """
+
+    metrics = {}
+    _ACTIVE.append(metrics)
+
+    profiler = cProfile.Profile() if profile_dir else None
+    rss_before = _peak_rss_mb()
+    cpu_before = _cpu_seconds()
+    start = time.perf_counter()
+    status = "ok"
+
+    if profiler:
+        profiler.enable()
+
+    try:
+        yield metrics
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+
+        _ACTIVE.pop()
+
+        rss_after = _peak_rss_mb()
+        record = {
+            "run_id": run_id,
+            "stage": name,
+            "status": status,
+            "wall_seconds": round(time.perf_counter() - start, 4),
+            "cpu_seconds": round(_cpu_seconds() - cpu_before, 4),
+            "peak_rss_mb": rss_after,
+            "peak_rss_growth_mb": (
+                round(rss_after - rss_before, 1) if rss_after is not None else None
+            ),
+        }
+        record.update(metrics)
+
+        if profiler:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+
+        write_run_log(run_log, record)
+
+
+def write_run_log(run_log, record):
+    if not run_log:
+        return
+
+    os.makedirs(os.path.dirname(run_log), exist_ok=True)
+    with open(run_log, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, default=str) + "\n")
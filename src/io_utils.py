@@ -0,0 +1,204 @@
+import importlib.util
+import pandas as pd
+import os
+
+from src.dense_panel import DensePanel, is_dense_panel, load_dense_panel
+from src.instrumentation import add_stage_metric, file_size
+from src.panel import EconomicPanel
+from src.schema import apply_schema, csv_dtypes
+from src.storage import is_dataset, iter_dataset, read_dataset
+
+
+# pandas' multithreaded pyarrow CSV parser when pyarrow is installed;
+# its setup cost only pays off from about a megabyte, smaller files
+# (reference tables, aggregate outputs) parse faster with the C parser
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+PYARROW_MIN_BYTES = 1 << 20
+
+_FILTER_OPS = {
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(v),
+    "not in": lambda s, v: ~s.isin(v),
+}
+
+
+def _apply_filters(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        mask &= _FILTER_OPS[op](df[col], value)
+
+    return df[mask]
+
+
+# =================================================
+# CSV reader
+# =================================================
+def csv_columns(path):
+    """
+    Header of a CSV file (only the first line is parsed).
+    """
+
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_csv(path, columns=None, dtype=None):
+    """
+    Reads a CSV file, parsing only the requested columns straight into
+    their declared dtypes.
+
+    - columns: columns to parse; those missing from the file are
+      skipped, so stages can declare optional columns (an empty frame
+      is returned when the file has none of them)
+    - dtype: {column: dtype} (default: the compact panel dtypes of
+      src.schema for the columns present)
+
+    Files of at least PYARROW_MIN_BYTES are parsed with CSV_ENGINE.
+    Chunked reads (iter_frames) always use the C parser, the only one
+    that supports chunksize.
+    """
+
+    header = csv_columns(path)
+    if columns is not None:
+        columns = [col for col in columns if col in header]
+
+        # pyarrow reads every column for usecols=[], the C parser none
+        if not columns:
+            return pd.DataFrame()
+
+    present = header if columns is None else columns
+    if dtype is None:
+        dtype = csv_dtypes(present)
+    else:
+        dtype = {col: value for col, value in dtype.items() if col in present}
+
+    size = file_size(path)
+    engine = CSV_ENGINE if size >= PYARROW_MIN_BYTES else "c"
+
+    df = pd.read_csv(path, usecols=columns, dtype=dtype, engine=engine)
+    add_stage_metric("bytes_read", size)
+
+    return df
+
+
+# =================================================
+# Stage input / output helpers
+# =================================================
+def load_frame(source, columns=None, filters=None):
+    """
+    Returns a DataFrame for a stage input.
+
+    Accepts a CSV path, a Parquet dataset directory (see src.storage),
+    a dense panel bundle or DensePanel (see src.dense_panel), an
+    in-memory DataFrame or an EconomicPanel (see src.panel). Panels
+    answer Country_ID / Year filters from their indexes without a scan.
+    DataFrames are copied so a stage never mutates the frame handed
+    over by the previous stage. Panel columns come back in the compact
+    dtypes of src.schema.
+
+    columns: project only these columns (columns the source does not
+             have are skipped)
+    filters: [(column, op, value), ...] predicates, pushed down to disk
+             for Parquet datasets and applied after loading otherwise
+    """
+
+    if is_dense_panel(source):
+        source = load_dense_panel(source)
+
+    if isinstance(source, DensePanel):
+        df, filters = source.select(columns=columns, filters=filters)
+        return _apply_filters(df, filters) if filters else df
+
+    if is_dataset(source):
+        return read_dataset(source, columns=columns, filters=filters)
+
+    if isinstance(source, EconomicPanel):
+        source, filters = source.select(filters)
+
+    if isinstance(source, pd.DataFrame):
+        df = source[[col for col in columns if col in source.columns]] if columns else source
+        if filters:
+            df = _apply_filters(df, filters)
+        return apply_schema(df.copy())
+
+    df = read_csv(source, columns=columns)
+    if filters:
+        df = _apply_filters(df, filters)
+
+    return df
+
+
+def iter_frames(source, columns=None, chunksize=None):
+    """
+    Yields a stage input as DataFrames of at most chunksize rows (one
+    frame when chunksize is None). CSV files and Parquet datasets are
+    read chunk by chunk and never held in memory whole. Requested
+    columns the source does not have are skipped, as in load_frame.
+    """
+
+    if chunksize is None:
+        yield load_frame(source, columns=columns)
+        return
+
+    if is_dataset(source) and not is_dense_panel(source):
+        add_stage_metric("bytes_read", file_size(source))
+        yield from iter_dataset(source, columns=columns, batch_size=chunksize)
+        return
+
+    if isinstance(source, str) and not is_dense_panel(source):
+        # same column handling as read_csv: missing columns are skipped
+        if columns is not None:
+            header = csv_columns(source)
+            columns = [col for col in columns if col in header]
+            if not columns:
+                yield pd.DataFrame()
+                return
+
+        add_stage_metric("bytes_read", file_size(source))
+        yield from pd.read_csv(source, usecols=columns, dtype=csv_dtypes(columns), chunksize=chunksize)
+        return
+
+    df = load_frame(source, columns=columns)
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def save_frame(df, output_path, label):
+    """
+    Writes a stage result to CSV. Skipped when output_path is None.
+    """
+
+    if output_path is None:
+        return
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df.to_csv(output_path, index=False)
+    add_stage_metric("bytes_written", file_size(output_path))
+
+    print(f"{label} saved to: {output_path}")
+
+
+def append_frame(df, output_path, label):
+    """
+    Appends rows to an existing CSV, matching its column order.
+    Writes a new file when output_path does not exist yet.
+    Skipped when output_path is None.
+    """
+
+    if output_path is None:
+        return
+
+    if not os.path.exists(output_path):
+        save_frame(df, output_path, label)
+        return
+
+    header = pd.read_csv(output_path, nrows=0).columns
+    size_before = file_size(output_path)
+    df[list(header)].to_csv(output_path, mode="a", header=False, index=False)
+    add_stage_metric("bytes_written", file_size(output_path) - size_before)
+
+    print(f"{label} appended to: {output_path} ({len(df)} rows)")
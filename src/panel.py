@@ -0,0 +1,129 @@
+import numpy as np
+
+from src.panel_ops import group_boundaries
+from src.schema import apply_schema
+
+
+# =================================================
+# Indexed panel
+# =================================================
+class EconomicPanel:
+    """
+    Intermediate dataset sorted by (Country_ID, Year) with precomputed
+    group offsets, for repeated lookups without full-table scans.
+
+    - country(country_id): rows of one country, a positional slice
+    - year(year): cross-section of one year, gathered through a
+      precomputed year ordering
+    - indicator(column, country_id=None): NumPy view of one column
+    - select(filters): narrows rows for load_frame filters on
+      Country_ID / Year ("==" and "in") through the offsets
+
+    Lookups of unknown keys return empty frames, like a filter would.
+    """
+
+    def __init__(self, df):
+        df = apply_schema(df)
+        self.df = df.sort_values(["Country_ID", "Year"], kind="stable").reset_index(drop=True)
+
+        starts, ends, _ = group_boundaries(self.df["Country_ID"])
+        country_ids = self.df["Country_ID"].to_numpy()[starts]
+        self._country_offsets = {
+            str(country_id): (start, end + 1)
+            for country_id, start, end in zip(country_ids, starts, ends)
+        }
+
+        years = self.df["Year"].to_numpy()
+        self._year_order = np.argsort(years, kind="stable")
+        year_starts, year_ends, _ = group_boundaries(years[self._year_order])
+        self._year_offsets = {
+            int(years[self._year_order[start]]): (start, end + 1)
+            for start, end in zip(year_starts, year_ends)
+        }
+
+    def __len__(self):
+        return len(self.df)
+
+    def __contains__(self, country_id):
+        return str(country_id) in self._country_offsets
+
+    @property
+    def countries(self):
+        return list(self._country_offsets)
+
+    @property
+    def years(self):
+        return sorted(self._year_offsets)
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    # -----------------------------
+    # Row positions
+    # -----------------------------
+    def _country_positions(self, country_ids):
+        ranges = [
+            np.arange(*self._country_offsets[str(country_id)])
+            for country_id in country_ids
+            if str(country_id) in self._country_offsets
+        ]
+        return np.sort(np.concatenate(ranges)) if ranges else np.empty(0, dtype=int)
+
+    def _year_positions(self, years):
+        ranges = [
+            self._year_order[slice(*self._year_offsets[int(year)])]
+            for year in years
+            if int(year) in self._year_offsets
+        ]
+        return np.sort(np.concatenate(ranges)) if ranges else np.empty(0, dtype=int)
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def country(self, country_id, columns=None):
+        start, end = self._country_offsets.get(str(country_id), (0, 0))
+        df = self.df if columns is None else self.df[columns]
+        return df.iloc[start:end]
+
+    def year(self, year, columns=None):
+        df = self.df if columns is None else self.df[columns]
+        return df.take(self._year_positions([year]))
+
+    def indicator(self, column, country_id=None):
+        values = self.df[column].to_numpy()
+        if country_id is None:
+            return values
+
+        start, end = self._country_offsets.get(str(country_id), (0, 0))
+        return values[start:end]
+
+    def select(self, filters=None):
+        """
+        Applies the Country_ID / Year equality and membership filters
+        through the offsets. Returns (rows, remaining_filters) where the
+        remaining filters still have to be applied to rows.
+        """
+
+        positions = None
+        remaining = []
+
+        for col, op, value in filters or []:
+            if col == "Country_ID" and op in ("==", "in"):
+                found = self._country_positions([value] if op == "==" else value)
+            elif col == "Year" and op in ("==", "in"):
+                found = self._year_positions([value] if op == "==" else value)
+            else:
+                remaining.append((col, op, value))
+                continue
+
+            positions = found if positions is None else np.intersect1d(positions, found)
+
+        if positions is None:
+            return self.df, remaining
+
+        # a single country stays a slice of the sorted panel
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            return self.df.iloc[positions[0]:positions[-1] + 1], remaining
+
+        return self.df.take(positions), remaining
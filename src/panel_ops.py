@@ -0,0 +1,38 @@
+import numpy as np
+
+
+# =================================================
+# Sorted-panel helpers
+# =================================================
+def group_boundaries(keys):
+    """
+    Group boundaries of a panel sorted by its group key.
+
+    Returns (starts, ends, group_idx):
+    - starts / ends: first and last row position of every group
+    - group_idx: group number of every row (0 .. n_groups - 1)
+    """
+
+    # categorical keys compare on their integer codes
+    if hasattr(keys, "cat"):
+        keys = keys.cat.codes
+    keys = np.asarray(keys)
+    n_rows = len(keys)
+
+    is_start = np.ones(n_rows, dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+
+    starts = np.flatnonzero(is_start)
+    ends = np.r_[starts[1:], n_rows] - 1
+    group_idx = np.cumsum(is_start) - 1
+
+    return starts, ends, group_idx
+
+
+def rows_from_end(ends, group_idx):
+    """
+    Position of every row counted from the end of its group
+    (0 = last row of the group).
+    """
+
+    return ends[group_idx] - np.arange(len(group_idx))
@@ -0,0 +1,116 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+
+MANIFEST_NAME = "manifest.json"
+
+# entries not used for this long are evicted
+MAX_AGE_DAYS = 30
+
+
+# =================================================
+# Render keys
+# =================================================
+def _update_digest(digest, part):
+    if isinstance(part, pd.DataFrame):
+        digest.update(json.dumps([list(map(str, part.columns)), list(map(str, part.dtypes))]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    elif callable(part):
+        # the module source covers the plot code and its style constants
+        digest.update(part.__qualname__.encode("utf-8"))
+        digest.update(inspect.getsource(inspect.getmodule(part)).encode("utf-8"))
+    else:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+
+
+def render_key(*parts):
+    """
+    Hash of everything a chart depends on. Parts can be DataFrames
+    (the exact data slice: values, columns and dtypes), plot functions
+    (their name and module source, i.e. the drawing code and the color
+    constants) and JSON-serializable parameters.
+    """
+
+    digest = hashlib.sha256()
+    for part in parts:
+        _update_digest(digest, part)
+    return digest.hexdigest()
+
+
+# =================================================
+# Manifest
+# =================================================
+class RenderCache:
+    """
+    Remembers which key every output file (PNG, HTML) was rendered from.
+
+    - is_fresh(output_path, key): the file exists, was not modified
+      since it was recorded and was rendered from the same key
+    - record(output_path, key, info=None): stores the key after a
+      render, with optional JSON-serializable info (e.g. sizes)
+    - save(): evicts stale entries (output missing or changed, or not
+      used for max_age_days) and writes the manifest
+
+    The manifest is a JSON file in cache_dir; deleting it only forces
+    the next run to render everything again.
+    """
+
+    def __init__(self, cache_dir, max_age_days=MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _stat(output_path):
+        stat = os.stat(output_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _unchanged(self, output_path, entry):
+        return os.path.isfile(output_path) and self._stat(output_path) == entry["stat"]
+
+    def is_fresh(self, output_path, key):
+        entry = self.entries.get(os.path.abspath(output_path))
+
+        if entry is None or entry["key"] != key or not self._unchanged(output_path, entry):
+            return False
+
+        entry["used"] = time.time()
+        self.hits += 1
+        return True
+
+    def info(self, output_path):
+        entry = self.entries.get(os.path.abspath(output_path))
+        return entry.get("info") if entry else None
+
+    def record(self, output_path, key, info=None):
+        self.entries[os.path.abspath(output_path)] = {
+            "key": key,
+            "stat": self._stat(output_path),
+            "used": time.time(),
+            "info": info,
+        }
+
+    def save(self):
+        now = time.time()
+        self.entries = {
+            path: entry
+            for path, entry in self.entries.items()
+            if now - entry["used"] <= self.max_age and self._unchanged(path, entry)
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.manifest_path)
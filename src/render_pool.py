@@ -0,0 +1,129 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from src.instrumentation import add_stage_metric, file_size
+from src.io_utils import load_frame
+from src.render_cache import render_key
+
+
+# =================================================
+# Chart jobs
+# =================================================
+class ChartJob:
+    """
+    One chart to render.
+
+    - name: job name used in the report
+    - func: module-level plot function, called as
+      func(data_slice, output_path=output_path, **kwargs)
+    - data: DataFrame, EconomicPanel, CSV path or Parquet dataset the
+      chart reads
+    - columns / filters: applied in the parent process (see
+      src.io_utils.load_frame) so only the slice the chart needs is
+      sent to the worker
+    """
+
+    def __init__(self, name, func, data, output_path, kwargs=None, columns=None, filters=None):
+        self.name = name
+        self.func = func
+        self.data = data
+        self.output_path = output_path
+        self.kwargs = dict(kwargs or {})
+        self.columns = columns
+        self.filters = filters
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render(func, data, output_path, kwargs):
+    start = time.perf_counter()
+
+    try:
+        value = func(data, output_path=output_path, **kwargs)
+        error = None
+    except Exception:
+        value = None
+        error = traceback.format_exc()
+
+    return value, error, time.perf_counter() - start
+
+
+# =================================================
+# Scheduler
+# =================================================
+def render_charts(jobs, max_workers=None, cache=None, force=False):
+    """
+    Renders independent chart jobs in a process pool (headless Agg
+    backend). max_workers=1 renders in the current process.
+
+    cache: src.render_cache.RenderCache; a job whose data slice, plot
+    function and kwargs hash to the key its output was rendered from
+    is not rendered again. force=True renders every job (the outputs
+    are still recorded in the cache).
+
+    Returns one dict per job with name, output_path, ok, cached,
+    seconds, error (formatted traceback or None) and value (what func
+    returned). A failing job does not stop the others.
+    """
+
+    start = time.perf_counter()
+
+    payloads = [
+        (job.func, load_frame(job.data, columns=job.columns, filters=job.filters), job.output_path, job.kwargs)
+        for job in jobs
+    ]
+
+    keys = [None] * len(jobs)
+    if cache is not None:
+        keys = [render_key(func, data, kwargs) for func, data, _, kwargs in payloads]
+
+    todo = [
+        i for i, (job, key) in enumerate(zip(jobs, keys))
+        if key is None or force or not cache.is_fresh(job.output_path, key)
+    ]
+
+    if max_workers is None:
+        max_workers = max(1, min(len(todo), os.cpu_count() or 1))
+
+    outcomes = [(None, None, 0.0)] * len(jobs)
+    if max_workers <= 1:
+        for i in todo:
+            outcomes[i] = _render(*payloads[i])
+    elif todo:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            futures = {i: pool.submit(_render, *payloads[i]) for i in todo}
+            for i, future in futures.items():
+                outcomes[i] = future.result()
+
+    results = []
+    for i, (job, (value, error, seconds)) in enumerate(zip(jobs, outcomes)):
+        rendered = i in todo
+        results.append({
+            "name": job.name,
+            "output_path": job.output_path,
+            "ok": error is None,
+            "cached": not rendered,
+            "seconds": round(seconds, 3),
+            "error": error,
+            "value": value,
+        })
+
+        if error:
+            print(f"Chart '{job.name}' failed:\n{error}")
+        elif rendered and os.path.isfile(job.output_path):
+            add_stage_metric("bytes_written", file_size(job.output_path))
+            if keys[i] is not None:
+                cache.record(job.output_path, keys[i])
+
+    failed = sum(not result["ok"] for result in results)
+    print(
+        f"Rendered {len(todo) - failed}/{len(jobs)} charts ({len(jobs) - len(todo)} unchanged) "
+        f"with {max_workers} worker(s) in {time.perf_counter() - start:.2f}s"
+    )
+
+    return results
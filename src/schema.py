@@ -0,0 +1,115 @@
+import pandas as pd
+
+
+# -----------------------------
+# Column schema
+# -----------------------------
+COLUMN_RENAMES = {
+    'country_name': 'Country',
+    'country_id': 'Country_ID',
+    'year': 'Year',
+    'Inflation (CPI %)': 'Inflation_CPI',
+    'GDP (Current USD)': 'GDP',
+    'GDP per Capita (Current USD)': 'GDP_per_Capita',
+    'Unemployment Rate (%)': 'Unemployment_Rate',
+    'Interest Rate (Real, %)': 'Interest_Rate',
+    'Inflation (GDP Deflator, %)': 'Inflation_GDP_Deflator',
+    'GDP Growth (% Annual)': 'GDP_Growth',
+    'Current Account Balance (% GDP)': 'Current_Account',
+    'Government Expense (% of GDP)': 'Gov_Expense',
+    'Government Revenue (% of GDP)': 'Gov_Revenue',
+    'Tax Revenue (% of GDP)': 'Tax_Revenue',
+    'Gross National Income (USD)': 'GNI',
+    'Public Debt (% of GDP)': 'Public_Debt'
+}
+
+INDICATOR_COLUMNS = [
+    col for col in COLUMN_RENAMES.values()
+    if col not in ("Country", "Country_ID", "Year")
+]
+
+CRITICAL_COLUMNS = ['GDP', 'Inflation_CPI', 'Unemployment_Rate']
+
+# realistic years (inclusive); rows outside are dropped while cleaning
+YEAR_RANGE = (1900, 2100)
+
+
+# -----------------------------
+# Compact panel dtypes
+# -----------------------------
+CATEGORY_COLUMNS = ["Country", "Country_ID", "Country_ISO3"]
+
+# Columns that feed growth rates, percent changes, sums and
+# volatilities keep float64: float32's ~7 significant digits are
+# amplified when nearby values are differenced
+FLOAT64_COLUMNS = ["GDP", "GDP_per_Capita", "GNI", "Inflation_CPI"]
+
+# The rest are float32; their CSV values (and aggregates of them, e.g.
+# avg_unemployment) are written with float32 precision, not float64
+FLOAT32_COLUMNS = [col for col in INDICATOR_COLUMNS if col not in FLOAT64_COLUMNS]
+
+PANEL_DTYPES = {
+    **{col: "category" for col in CATEGORY_COLUMNS},
+    "Year": "int16",
+    **{col: "float32" for col in FLOAT32_COLUMNS},
+    **{col: "float64" for col in FLOAT64_COLUMNS},
+}
+
+
+def _matches(series, dtype):
+    if dtype == "category":
+        return isinstance(series.dtype, pd.CategoricalDtype)
+    return series.dtype == dtype
+
+
+# =================================================
+# Readers / writers
+# =================================================
+def csv_dtypes(columns=None):
+    """
+    dtype mapping for pd.read_csv, so columns are parsed straight into
+    the compact dtypes. Columns missing from the file are ignored.
+    """
+
+    if columns is None:
+        return dict(PANEL_DTYPES)
+    return {col: dtype for col, dtype in PANEL_DTYPES.items() if col in columns}
+
+
+def apply_schema(df):
+    """
+    Casts the panel columns present in df to PANEL_DTYPES:
+    - Country / Country_ID / Country_ISO3 as categoricals
+    - Year as int16
+    - indicators as float32, except FLOAT64_COLUMNS
+
+    Other columns (derived features, aggregates) keep their dtype.
+    Columns that already match are left untouched.
+    """
+
+    casts = {
+        col: dtype
+        for col, dtype in PANEL_DTYPES.items()
+        if col in df.columns and not _matches(df[col], dtype)
+    }
+
+    if casts:
+        df = df.astype(casts)
+
+    return df
+
+
+def check_schema(df, stage):
+    """
+    Raises TypeError when a panel column of df does not have its
+    PANEL_DTYPES dtype. Used at stage boundaries.
+    """
+
+    mismatches = [
+        f"{col} is {df[col].dtype}, expected {dtype}"
+        for col, dtype in PANEL_DTYPES.items()
+        if col in df.columns and not _matches(df[col], dtype)
+    ]
+
+    if mismatches:
+        raise TypeError(f"Stage '{stage}' returned unexpected dtypes: {'; '.join(mismatches)}")
@@ -0,0 +1,263 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+from src.instrumentation import count_rows, measure_stage, write_run_log
+from src.schema import check_schema
+
+
+# =================================================
+# Stage declaration
+# =================================================
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    - name: unique stage name
+    - func: called as func(*dependency_results, **params)
+    - deps: names of upstream stages whose results are passed to func
+    - params: keyword parameters (part of the fingerprint)
+    - files: input files whose content is part of the fingerprint
+    - code: callables or module names ("src.visualization") whose
+      module source is part of the fingerprint, together with every
+      module of the same package they import (e.g. src.schema,
+      src.io_utils); module names keep heavy modules from being
+      imported just to declare the stage
+    - outputs: files the stage writes; a stage is only skipped when
+      all of them exist
+    - load: returns the stage result from its outputs, used when a
+      skipped stage feeds a stage that does run
+    """
+
+    def __init__(
+        self,
+        name,
+        func,
+        deps=(),
+        params=None,
+        files=(),
+        code=(),
+        outputs=(),
+        load=None
+    ):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.params = dict(params or {})
+        self.files = list(files)
+        self.code = list(code)
+        self.outputs = list(outputs)
+        self.load = load
+
+
+# =================================================
+# Fingerprints
+# =================================================
+def _file_digest(path):
+    digest = hashlib.sha256()
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _module_source(name):
+    with open(importlib.util.find_spec(name).origin, encoding="utf-8") as f:
+        return f.read()
+
+
+def _package_imports(source, package):
+    """
+    Modules of `package` imported anywhere in source, including the
+    function-level imports of lazily loaded modules.
+    """
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        elif isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        else:
+            continue
+
+        for name in names:
+            if name.split(".")[0] == package:
+                yield name
+
+
+def code_sources(code):
+    """
+    {module name: source} of the modules implementing the callables /
+    module names in code and, transitively, of the modules of their
+    package they import. Editing a shared helper module (schema, I/O,
+    storage) therefore changes the fingerprint of every stage using it.
+    """
+
+    pending = [obj if isinstance(obj, str) else inspect.getmodule(obj).__name__ for obj in code]
+    sources = {}
+
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+
+        sources[name] = _module_source(name)
+        pending.extend(_package_imports(sources[name], name.split(".")[0]))
+
+    return sources
+
+
+def stage_fingerprint(stage, dep_fingerprints):
+    """
+    Hashes everything a stage result depends on: input file contents,
+    parameters, the source of the modules implementing it (see
+    code_sources) and the fingerprints of upstream stages.
+    """
+
+    payload = {
+        "files": {path: _file_digest(path) for path in stage.files},
+        "params": stage.params,
+        "code": code_sources(stage.code),
+        "deps": [dep_fingerprints[name] for name in stage.deps],
+    }
+
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _read_state(state_path):
+    if not os.path.exists(state_path):
+        return {}
+
+    with open(state_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_state(state_path, state):
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+# =================================================
+# Selection
+# =================================================
+def with_dependencies(stages, names):
+    """
+    Names of the given stages plus everything upstream of them.
+    """
+
+    by_name = {stage.name: stage for stage in stages}
+    selected = set()
+    pending = list(names)
+
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(by_name[name].deps)
+
+    return selected
+
+
+# =================================================
+# Runner
+# =================================================
+def run_stages(
+    stages,
+    state_path,
+    force=False,
+    run_log=None,
+    profile_dir=None,
+    only=None,
+    skip=None
+):
+    """
+    Runs stages in declaration order (dependencies must come first).
+
+    A stage is skipped when its fingerprint matches the one stored in
+    state_path from the previous run and all of its outputs exist.
+    Results of skipped stages are loaded from their outputs only if a
+    downstream stage actually runs. force=True runs every stage.
+
+    only / skip: stage names to run exclusively / leave out. Stages
+    that are not selected never run; a selected stage that needs their
+    result loads it from their outputs.
+
+    Every stage appends a record to the JSON-lines run_log (see
+    src.instrumentation.measure_stage); with profile_dir each executed
+    stage also gets a cProfile dump in <profile_dir>/<run_id>/.
+    DataFrame results are checked against the compact panel dtypes
+    (src.schema.check_schema).
+
+    Returns a dict of stage name -> result for the stages that ran.
+    """
+
+    run_id = time.strftime("%Y%m%dT%H%M%S")
+    if profile_dir:
+        profile_dir = os.path.join(profile_dir, run_id)
+
+    state = _read_state(state_path)
+    by_name = {stage.name: stage for stage in stages}
+
+    fingerprints = {}
+    results = {}
+
+    selected = set(only) if only is not None else set(by_name)
+    selected -= set(skip or ())
+
+    def resolve(name):
+        if name not in results:
+            if by_name[name].load is None:
+                raise RuntimeError(f"Stage '{name}' did not run and its result cannot be loaded")
+            results[name] = by_name[name].load()
+        return results[name]
+
+    for stage in stages:
+        fingerprint = stage_fingerprint(stage, fingerprints)
+        fingerprints[stage.name] = fingerprint
+
+        if stage.name not in selected:
+            continue
+
+        up_to_date = (
+            not force
+            and stage.outputs
+            and state.get(stage.name) == fingerprint
+            and all(os.path.exists(path) for path in stage.outputs)
+        )
+
+        if up_to_date:
+            print(f"Stage '{stage.name}' is up to date, skipped")
+            write_run_log(run_log, {"run_id": run_id, "stage": stage.name, "status": "skipped"})
+            continue
+
+        dep_results = [resolve(name) for name in stage.deps]
+
+        with measure_stage(stage.name, run_log=run_log, profile_dir=profile_dir, run_id=run_id) as metrics:
+            rows_in = [count_rows(result) for result in dep_results]
+            if any(rows is not None for rows in rows_in):
+                metrics["rows_in"] = sum(rows or 0 for rows in rows_in)
+
+            results[stage.name] = stage.func(*dep_results, **stage.params)
+            metrics["rows_out"] = count_rows(results[stage.name])
+
+        if isinstance(results[stage.name], pd.DataFrame):
+            check_schema(results[stage.name], stage.name)
+
+        state[stage.name] = fingerprint
+        _write_state(state_path, state)
+
+    return results
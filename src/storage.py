@@ -0,0 +1,111 @@
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+from src.instrumentation import add_stage_metric, file_size
+from src.schema import apply_schema
+
+
+# =================================================
+# Columnar (Parquet) dataset storage
+# =================================================
+def write_dataset(df, dataset_dir, partition_by="Year", existing="overwrite", verbose=True):
+    """
+    Writes a DataFrame as a Hive-partitioned Parquet dataset.
+
+    Layout: <dataset_dir>/<partition_by>=<value>/part-0.parquet
+
+    existing:
+    - "overwrite": remove the whole dataset first
+    - "append": add new files next to the existing ones, so rows of an
+      already existing partition are kept
+
+    Categorical columns are stored as plain strings (Parquet dictionary
+    encodes them on disk anyway), so files appended with different
+    category sets still share one schema.
+    """
+
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if existing == "overwrite" and os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+
+    size_before = file_size(dataset_dir)
+
+    if existing == "append":
+        basename_template = f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+    else:
+        basename_template = "part-{i}.parquet"
+
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if categorical:
+        df = df.astype({col: object for col in categorical})
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=[partition_by],
+        partitioning_flavor="hive",
+        existing_data_behavior="overwrite_or_ignore",
+        basename_template=basename_template
+    )
+    add_stage_metric("bytes_written", file_size(dataset_dir) - size_before)
+
+    if verbose:
+        print(f"Parquet dataset saved to: {dataset_dir}")
+
+
+def read_dataset(dataset_dir, columns=None, filters=None):
+    """
+    Reads a Parquet dataset written by write_dataset.
+
+    columns: only these columns are read from disk (missing ones are
+             skipped)
+    filters: pyarrow-style predicates, e.g. [("Country_ID", "==", "tr")].
+             Predicates on the partition column skip whole directories,
+             the rest are pushed down to row-group statistics.
+    """
+
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+    expression = pq.filters_to_expression(filters) if filters else None
+
+    add_stage_metric("bytes_read", sum(
+        os.path.getsize(fragment.path)
+        for fragment in dataset.get_fragments(filter=expression)
+    ))
+
+    if columns is not None:
+        columns = [col for col in columns if col in dataset.schema.names]
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    return apply_schema(table.to_pandas())
+
+
+def iter_dataset(dataset_dir, columns=None, filters=None, batch_size=250_000):
+    """
+    Yields a Parquet dataset as DataFrames of at most batch_size rows,
+    so it can be aggregated without loading it whole.
+    """
+
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+    expression = pq.filters_to_expression(filters) if filters else None
+
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size):
+        if batch.num_rows:
+            yield apply_schema(batch.to_pandas())
+
+
+def is_dataset(path):
+    return isinstance(path, str) and os.path.isdir(path)
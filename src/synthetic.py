@@ -0,0 +1,200 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.schema import COLUMN_RENAMES, YEAR_RANGE
+
+
+# -----------------------------
+# Raw schema and NaN patterns
+# -----------------------------
+# (share of entities that never report the indicator,
+#  share of missing rows overall) - measured on data/raw/dataset.csv
+MISSING_RATES = {
+    "Inflation (CPI %)": (0.115, 0.224),
+    "GDP (Current USD)": (0.014, 0.155),
+    "GDP per Capita (Current USD)": (0.014, 0.154),
+    "Unemployment Rate (%)": (0.138, 0.195),
+    "Interest Rate (Real, %)": (0.336, 0.500),
+    "Inflation (GDP Deflator, %)": (0.023, 0.164),
+    "GDP Growth (% Annual)": (0.018, 0.161),
+    "Current Account Balance (% GDP)": (0.106, 0.262),
+    "Government Expense (% of GDP)": (0.304, 0.476),
+    "Government Revenue (% of GDP)": (0.304, 0.473),
+    "Tax Revenue (% of GDP)": (0.300, 0.472),
+    "Gross National Income (USD)": (0.055, 0.195),
+    "Public Debt (% of GDP)": (0.604, 0.755),
+}
+
+RAW_INDICATORS = list(MISSING_RATES)
+
+# the latest year is often not published yet
+LATEST_YEAR_MISSING = 0.5
+
+REAL_COUNTRIES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "raw",
+    "dataset.csv"
+)
+
+
+def _entity_names(n_entities):
+    """
+    Real country names/ids first, then synthetic regions.
+    """
+
+    names, ids = [], []
+
+    if os.path.exists(REAL_COUNTRIES_PATH):
+        real = (
+            pd.read_csv(REAL_COUNTRIES_PATH, usecols=["country_name", "country_id"])
+            .drop_duplicates("country_id")
+            .head(n_entities)
+        )
+        names = real["country_name"].tolist()
+        ids = real["country_id"].tolist()
+
+    for i in range(len(names), n_entities):
+        names.append(f"Region {i:07d}")
+        ids.append(f"r{i:07d}")
+
+    return np.array(names, dtype=object), np.array(ids, dtype=object)
+
+
+def _simulate(indicator, rng, n_entities, n_years, log_gdp, growth):
+    shape = (n_entities, n_years)
+
+    if indicator == "GDP (Current USD)":
+        return np.exp(log_gdp)
+    if indicator == "GDP Growth (% Annual)":
+        return growth * 100
+    if indicator == "GDP per Capita (Current USD)":
+        return np.exp(log_gdp - rng.normal(16, 1.2, (n_entities, 1)))
+    if indicator == "Gross National Income (USD)":
+        return np.exp(log_gdp) * rng.normal(1.0, 0.05, shape)
+    if indicator in ("Inflation (CPI %)", "Inflation (GDP Deflator, %)"):
+        base = rng.lognormal(1.2, 0.6, (n_entities, 1))
+        values = base + rng.normal(0, 2.5, shape)
+        # rare hyperinflation episodes
+        values += (rng.random(shape) < 0.005) * rng.lognormal(4.5, 1.0, shape)
+        return values
+    if indicator == "Unemployment Rate (%)":
+        return np.clip(rng.normal(7.5, 4.5, (n_entities, 1)) + rng.normal(0, 1.0, shape), 0.1, None)
+    if indicator == "Interest Rate (Real, %)":
+        return rng.normal(5.0, 6.0, shape)
+    if indicator == "Current Account Balance (% GDP)":
+        return rng.normal(-2.0, 4.0, (n_entities, 1)) + rng.normal(0, 3.0, shape)
+    if indicator in ("Government Expense (% of GDP)", "Government Revenue (% of GDP)"):
+        return np.clip(rng.normal(27, 8, (n_entities, 1)) + rng.normal(0, 2, shape), 1, None)
+    if indicator == "Tax Revenue (% of GDP)":
+        return np.clip(rng.normal(17, 5, (n_entities, 1)) + rng.normal(0, 1.5, shape), 0.5, None)
+    if indicator == "Public Debt (% of GDP)":
+        return np.clip(rng.normal(60, 30, (n_entities, 1)) + np.cumsum(rng.normal(0, 3, shape), axis=1), 1, None)
+
+    # extra indicators beyond the real schema
+    return rng.normal(0, 10, (n_entities, 1)) + rng.normal(0, 2, shape)
+
+
+def generate_raw_panel(n_entities=200, n_years=16, n_indicators=13, start_year=2010, seed=0):
+    """
+    Generates a synthetic raw dataset with the real column schema.
+
+    - GDP follows a per-entity log random walk with occasional
+      contractions; the other indicators are entity levels plus noise
+    - NaNs follow the real data: some entities never report an
+      indicator, the rest miss rows at the measured overall rate, and
+      the latest year is often unpublished
+    - n_indicators: the first n raw indicators (GDP, CPI and unemployment
+      are always included so prepare_data keeps rows); values above 13
+      add generic "Indicator N" columns
+    - start_year is moved earlier when the panel would run past the
+      last year prepare_data keeps (src.schema.YEAR_RANGE), so no
+      generated row is dropped as unrealistic
+
+    Rows: n_entities * n_years.
+    """
+
+    first_year, last_year = YEAR_RANGE
+    if n_years > last_year - first_year + 1:
+        raise ValueError(f"n_years={n_years} does not fit in the years {first_year}-{last_year}")
+    start_year = max(first_year, min(start_year, last_year - n_years + 1))
+
+    rng = np.random.default_rng(seed)
+    shape = (n_entities, n_years)
+
+    names, ids = _entity_names(n_entities)
+    years = np.arange(start_year, start_year + n_years)
+
+    growth = rng.normal(0.03, 0.05, shape) - (rng.random(shape) < 0.08) * rng.uniform(0.02, 0.15, shape)
+    log_gdp = rng.normal(24, 2.2, (n_entities, 1)) + np.cumsum(growth, axis=1)
+
+    critical = ["GDP (Current USD)", "Inflation (CPI %)", "Unemployment Rate (%)"]
+    indicators = critical + [col for col in RAW_INDICATORS if col not in critical]
+    indicators = indicators[:n_indicators]
+    indicators += [f"Indicator {i + 1}" for i in range(len(RAW_INDICATORS), n_indicators)]
+
+    data = {
+        "country_name": np.repeat(names, n_years),
+        "country_id": np.repeat(ids, n_years),
+        "year": np.tile(years, n_entities),
+    }
+
+    for indicator in indicators:
+        values = _simulate(indicator, rng, n_entities, n_years, log_gdp, growth)
+        values = np.broadcast_to(values, shape).astype(float)
+
+        p_entity, p_total = MISSING_RATES.get(indicator, (0.1, 0.2))
+        p_row = max(p_total - p_entity, 0) / (1 - p_entity)
+
+        missing = rng.random(shape) < p_row
+        missing |= rng.random((n_entities, 1)) < p_entity
+        missing[:, -1] |= rng.random(n_entities) < LATEST_YEAR_MISSING
+
+        data[indicator] = np.where(missing, np.nan, values).ravel()
+
+    # keep the raw column order for the known indicators
+    ordered = ["country_name", "country_id", "year"] + [
+        col for col in list(COLUMN_RENAMES)[3:] + indicators if col in data
+    ]
+    return pd.DataFrame(data)[list(dict.fromkeys(ordered))]
+
+
+def write_raw_panel(
+    output_path,
+    n_entities=200,
+    n_years=16,
+    n_indicators=13,
+    start_year=2010,
+    seed=0,
+    entities_per_chunk=50_000
+):
+    """
+    Writes a synthetic raw CSV in entity chunks, so panels with ~10M
+    rows can be produced without holding them in memory.
+    """
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    all_names, all_ids = _entity_names(n_entities)
+    written = 0
+
+    for chunk_index, first in enumerate(range(0, n_entities, entities_per_chunk)):
+        size = min(entities_per_chunk, n_entities - first)
+
+        chunk = generate_raw_panel(
+            n_entities=size,
+            n_years=n_years,
+            n_indicators=n_indicators,
+            start_year=start_year,
+            seed=seed + chunk_index
+        )
+        chunk["country_name"] = np.repeat(all_names[first:first + size], n_years)
+        chunk["country_id"] = np.repeat(all_ids[first:first + size], n_years)
+
+        chunk.to_csv(output_path, mode="w" if first == 0 else "a", header=first == 0, index=False)
+        written += len(chunk)
+
+    print(f"Synthetic raw panel saved to: {output_path} ({written} rows)")
+    return written
@@ -0,0 +1,138 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from src.io_utils import load_frame, save_frame
+from src.panel_ops import group_boundaries, rows_from_end
+from src.schema import INDICATOR_COLUMNS
+
+
+# =================================================
+# Student-t critical values (no SciPy dependency)
+# =================================================
+def t_critical(dof, alpha=0.05):
+    """
+    Two-sided critical value of Student's t distribution.
+
+    Exact for 1 and 2 degrees of freedom, Cornish-Fisher expansion
+    otherwise (relative error below 1% for dof >= 3 and alpha >= 0.01,
+    shrinking quickly with more degrees of freedom).
+    Returns NaN for dof < 1. Accepts scalars or arrays.
+    """
+
+    p = 1 - alpha / 2
+    z = NormalDist().inv_cdf(p)
+
+    dof = np.asarray(dof, dtype=float)
+    v = np.where(dof >= 1, dof, np.nan)
+
+    t = (
+        z
+        + (z ** 3 + z) / (4 * v)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3)
+        + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * v ** 4)
+    )
+
+    t = np.where(dof == 1, math.tan(math.pi * (p - 0.5)), t)
+    t = np.where(dof == 2, (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p))), t)
+
+    return t
+
+
+# =================================================
+# Segmented least squares
+# =================================================
+def _segment_sums(values, starts):
+    return np.add.reduceat(values, starts, axis=0)
+
+
+def compute_trend_slopes(
+    input_path,
+    output_path,
+    indicators=None,
+    window=None,
+    alpha=0.05
+):
+    """
+    Fits y = intercept + slope * Year for every country and indicator.
+
+    All fits run at once: the panel is sorted by (Country_ID, Year) and
+    the least-squares moments are segmented sums over the country
+    boundaries (np.add.reduceat), centred on each country's mean year.
+    Missing values are ignored per indicator.
+
+    - indicators: columns to fit (default: all renamed raw indicators)
+    - window: only use the last N rows of each country
+    - alpha: significance level of the two-sided slope t-test
+
+    Output (long format): Country_ID, Country, indicator, n_obs, slope,
+    intercept, r2, t_stat, significant
+    """
+
+    columns = ["Country_ID", "Country", "Year"] + list(indicators or INDICATOR_COLUMNS)
+
+    df = load_frame(input_path, columns=columns)
+    indicators = [col for col in (indicators or INDICATOR_COLUMNS) if col in df.columns]
+
+    df = df.sort_values(["Country_ID", "Year"])
+
+    starts, ends, group_idx = group_boundaries(df["Country_ID"])
+
+    x = df["Year"].to_numpy(dtype=float)[:, None]
+    y = df[indicators].to_numpy(dtype=float)
+
+    valid = ~np.isnan(y)
+    if window is not None:
+        valid &= (rows_from_end(ends, group_idx) < window)[:, None]
+
+    w = valid.astype(float)
+    y0 = np.where(valid, y, 0.0)
+
+    # first pass: means
+    n = _segment_sums(w, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = _segment_sums(w * x, starts) / n
+        mean_y = _segment_sums(y0, starts) / n
+
+    # second pass: centred moments
+    dx = np.where(valid, x - mean_x[group_idx], 0.0)
+    dy = np.where(valid, y0 - mean_y[group_idx], 0.0)
+
+    sxx = _segment_sums(dx * dx, starts)
+    sxy = _segment_sums(dx * dy, starts)
+    syy = _segment_sums(dy * dy, starts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        intercept = mean_y - slope * mean_x
+        r2 = np.where(syy > 0, sxy ** 2 / (sxx * syy), np.nan)
+
+        dof = n - 2
+        residual_ss = np.clip(syy - slope * sxy, 0, None)
+        std_err = np.sqrt(residual_ss / dof / sxx)
+        t_stat = np.where(dof > 0, slope / std_err, np.nan)
+
+    significant = np.abs(t_stat) > t_critical(dof, alpha)
+
+    n_groups, n_indicators = n.shape
+    # .array keeps the categorical dtype of the country columns
+    countries = df["Country_ID"].array[starts]
+    names = df["Country"].array[starts]
+
+    slopes_df = pd.DataFrame({
+        "Country_ID": countries.repeat(n_indicators),
+        "Country": names.repeat(n_indicators),
+        "indicator": np.tile(indicators, n_groups),
+        "n_obs": n.ravel().astype(int),
+        "slope": slope.ravel(),
+        "intercept": intercept.ravel(),
+        "r2": r2.ravel(),
+        "t_stat": t_stat.ravel(),
+        "significant": significant.ravel(),
+    })
+
+    save_frame(slopes_df, output_path, "Trend slopes")
+    return slopes_df
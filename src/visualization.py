@@ -1,7 +1,13 @@
+import hashlib
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import os
 
+from src.instrumentation import add_stage_metric, file_size
+from src.io_utils import load_frame
+from src.render_cache import render_key
+
 
 # -----------------------------
 # Global style (pastel turquoise)
@@ -17,7 +23,7 @@ REF_LINE_COLOR = "#7A7A7A"
 # Global Trends Visualizations
 # =================================================
 def plot_global_inflation_trend(input_path, output_path):
-    df = pd.read_csv(input_path)
+    df = load_frame(input_path, columns=["Year", "global_mean_inflation"])
 
     df["Year"] = df["Year"].astype(int)
     df = df.sort_values("Year")
@@ -44,7 +50,7 @@ def plot_global_inflation_trend(input_path, output_path):
 
 
 def plot_global_gdp_growth_trend(input_path, output_path):
-    df = pd.read_csv(input_path)
+    df = load_frame(input_path, columns=["Year", "mean_global_gdp_growth"])
 
     df["Year"] = df["Year"].astype(int)
     df = df.sort_values("Year")
@@ -80,7 +86,7 @@ def plot_global_gdp_growth_trend(input_path, output_path):
 # Country Comparison Visualizations
 # =================================================
 def plot_top_countries_by_avg_gdp(input_path, output_path, top_n=10):
-    df = pd.read_csv(input_path)
+    df = load_frame(input_path, columns=["country_name", "avg_gdp"])
 
     top_df = (
         df.sort_values("avg_gdp", ascending=False)
@@ -105,7 +111,7 @@ def plot_top_countries_by_avg_gdp(input_path, output_path, top_n=10):
 
 
 def plot_crisis_years_by_country(input_path, output_path, top_n=10):
-    df = pd.read_csv(input_path)
+    df = load_frame(input_path, columns=["Country", "crisis_year_count"])
 
     top_df = (
         df.sort_values("crisis_year_count", ascending=False)
@@ -134,10 +140,14 @@ def plot_crisis_years_by_country(input_path, output_path, top_n=10):
 # Country Case Study Visualizations
 # =================================================
 def plot_country_gdp_trend(input_path, country_id, output_path):
-    df = pd.read_csv(input_path)
+    country_df = load_frame(
+        input_path,
+        columns=["Country_ID", "Year", "GDP", "GDP_rolling_avg"],
+        filters=[("Country_ID", "==", country_id)]
+    )
 
-    df["Year"] = df["Year"].astype(int)
-    country_df = df[df["Country_ID"] == country_id]
+    country_df["Year"] = country_df["Year"].astype(int)
+    country_df = country_df.sort_values("Year")
 
     if country_df.empty:
         print(f"No data found for country_id: {country_id}")
@@ -175,10 +185,14 @@ def plot_country_gdp_trend(input_path, country_id, output_path):
 
 
 def plot_country_inflation_trend(input_path, country_id, output_path):
-    df = pd.read_csv(input_path)
+    country_df = load_frame(
+        input_path,
+        columns=["Country_ID", "Year", "Inflation_CPI", "Inflation_rolling_avg"],
+        filters=[("Country_ID", "==", country_id)]
+    )
 
-    df["Year"] = df["Year"].astype(int)
-    country_df = df[df["Country_ID"] == country_id]
+    country_df["Year"] = country_df["Year"].astype(int)
+    country_df = country_df.sort_values("Year")
 
     if country_df.empty:
         print(f"No data found for country_id: {country_id}")
@@ -213,3 +227,193 @@ def plot_country_inflation_trend(input_path, country_id, output_path):
     plt.tight_layout()
     plt.savefig(output_path)
     plt.close()
+
+
+# =================================================
+# Batch Country Visualizations
+# =================================================
+COUNTRY_TREND_SPECS = {
+    "gdp": {
+        "value": "GDP",
+        "rolling": "GDP_rolling_avg",
+        "label": "GDP",
+        "ylabel": "GDP",
+        "title": "GDP Trend for {}",
+        "filename": "country_gdp_trend_{}.png",
+    },
+    "inflation": {
+        "value": "Inflation_CPI",
+        "rolling": "Inflation_rolling_avg",
+        "label": "Inflation",
+        "ylabel": "Inflation (%)",
+        "title": "Inflation Trend for {}",
+        "filename": "country_inflation_trend_{}.png",
+    },
+}
+
+
+def _render_country_batch(df, output_path, kind="gdp"):
+    """
+    Renders one chart per country in df (sorted by Country_ID, Year)
+    into the directory output_path, reusing a single figure and only
+    swapping the line data between countries.
+    """
+
+    spec = COUNTRY_TREND_SPECS[kind]
+    os.makedirs(output_path, exist_ok=True)
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    value_line, = ax.plot([], [], label=spec["label"], color=LIGHT_COLOR, linewidth=1.8)
+    rolling_line, = ax.plot([], [], label="Rolling Average", color=MAIN_COLOR, linewidth=2.5)
+
+    ax.set_xlabel("Year")
+    ax.set_ylabel(spec["ylabel"])
+    ax.legend()
+    ax.grid(True, color=GRID_COLOR)
+
+    written = []
+    for country_id, country_df in df.groupby("Country_ID", sort=False, observed=True):
+        years = country_df["Year"].to_numpy()
+
+        value_line.set_data(years, country_df[spec["value"]].to_numpy())
+        rolling_line.set_data(years, country_df[spec["rolling"]].to_numpy())
+
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title(spec["title"].format(country_id))
+        ax.set_xticks(years[::2])
+        ax.tick_params(axis="x", labelrotation=45)
+
+        path = os.path.join(output_path, spec["filename"].format(str(country_id).upper()))
+        fig.tight_layout()
+        fig.savefig(path)
+        written.append(path)
+
+    plt.close(fig)
+    return written
+
+
+def _country_render_keys(df, kind):
+    """
+    Render key of every country's slice of df (sorted by Country_ID,
+    Year), see src.render_cache.render_key.
+    """
+
+    base = render_key(_render_country_batch, kind, list(df.columns), list(map(str, df.dtypes)))
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    codes = df["Country_ID"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    bounds = np.r_[starts, len(codes)]
+
+    return {
+        codes[begin]: hashlib.sha256(base.encode("utf-8") + row_hashes[begin:end].tobytes()).hexdigest()
+        for begin, end in zip(bounds[:-1], bounds[1:])
+    }
+
+
+def plot_country_trends_batch(
+    input_path,
+    output_dir,
+    kind="gdp",
+    country_ids=None,
+    max_workers=1,
+    cache=None,
+    force=False
+):
+    """
+    Renders the GDP ("gdp") or inflation ("inflation") trend chart for
+    every country (or only country_ids) in one pass.
+
+    The panel is loaded once with only the needed columns and grouped by
+    Country_ID a single time. With max_workers > 1 the countries are
+    split into contiguous batches rendered in a process pool
+    (see src.render_pool). With a cache (src.render_cache.RenderCache)
+    only countries whose data or chart code changed are rendered;
+    force=True renders every country and refreshes the cache.
+
+    Raises RuntimeError naming the failed batches when any batch fails
+    (after saving the cache entries of the batches that succeeded).
+    """
+
+    from src.render_pool import ChartJob, render_charts
+
+    spec = COUNTRY_TREND_SPECS[kind]
+    filters = [("Country_ID", "in", list(country_ids))] if country_ids is not None else None
+
+    df = load_frame(
+        input_path,
+        columns=["Country_ID", "Year", spec["value"], spec["rolling"]],
+        filters=filters
+    )
+    df["Year"] = df["Year"].astype(int)
+    df = df.sort_values(["Country_ID", "Year"])
+
+    if df.empty:
+        print("No data found for the requested countries")
+        return []
+
+    def chart_path(country_id):
+        return os.path.join(output_dir, spec["filename"].format(str(country_id).upper()))
+
+    paths = [chart_path(country_id) for country_id in pd.unique(df["Country_ID"].to_numpy())]
+
+    keys = {}
+    if cache is not None:
+        keys = _country_render_keys(df, kind)
+        keys = {
+            country_id: key for country_id, key in keys.items()
+            if force or not cache.is_fresh(chart_path(country_id), key)
+        }
+        df = df[df["Country_ID"].isin(list(keys))]
+
+        print(f"Country {kind} charts: {len(keys)} to render, {len(paths) - len(keys)} unchanged")
+        if df.empty:
+            return paths
+
+    def record(batch_df):
+        for country_id in pd.unique(batch_df["Country_ID"].to_numpy()):
+            if country_id in keys:
+                cache.record(chart_path(country_id), keys[country_id])
+
+    if max_workers <= 1:
+        written = _render_country_batch(df, output_dir, kind=kind)
+        record(df)
+        add_stage_metric("bytes_written", sum(file_size(path) for path in written))
+        return paths
+
+    # contiguous row ranges that start at country boundaries
+    codes = df["Country_ID"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    per_batch = -(-len(starts) // max_workers)
+    bounds = list(starts[::per_batch]) + [len(codes)]
+
+    jobs = [
+        ChartJob(
+            f"country_{kind}_batch_{i}",
+            _render_country_batch,
+            df.iloc[bounds[i]:bounds[i + 1]],
+            output_dir,
+            kwargs={"kind": kind}
+        )
+        for i in range(len(bounds) - 1)
+    ]
+
+    failed = []
+    written = []
+    for job, result in zip(jobs, render_charts(jobs, max_workers=max_workers)):
+        if result["ok"]:
+            record(job.data)
+            written.extend(result["value"])
+        else:
+            failed.append(result["name"])
+
+    add_stage_metric("bytes_written", sum(file_size(path) for path in written))
+
+    if failed:
+        # keep the batches that did render, so a re-run only retries the rest
+        if cache is not None:
+            cache.save()
+        raise RuntimeError(f"Country chart rendering failed for: {', '.join(failed)}")
+
+    return paths
@@ -0,0 +1,10 @@
+import os
+import sys
+
+
+# tests import the pipeline modules as `src.*` and `main`, like the
+# scripts run from the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.instrumentation import measure_stage
+from src.render_cache import RenderCache
+from src.visualization import plot_country_trends_batch
+
+
+def country_panel(country_ids):
+    rows = [
+        (country_id, year, 100.0 + year, 100.0 + year)
+        for country_id in country_ids
+        for year in range(2000, 2004)
+    ]
+    return pd.DataFrame(rows, columns=["Country_ID", "Year", "GDP", "GDP_rolling_avg"])
+
+
+def test_failed_pool_batch_raises_and_keeps_successful_batches(tmp_path):
+    # "c/x" points into a missing sub-directory, so its batch cannot save
+    df = country_panel(["aa", "bb", "c/x", "dd"])
+    output_dir = tmp_path / "countries"
+    cache = RenderCache(str(tmp_path / "cache"))
+
+    with pytest.raises(RuntimeError, match="country_gdp_batch_1"):
+        plot_country_trends_batch(df, str(output_dir), kind="gdp", max_workers=2, cache=cache)
+
+    saved = RenderCache(str(tmp_path / "cache"))
+    recorded = {os.path.basename(path) for path in saved.entries}
+    assert recorded == {"country_gdp_trend_AA.png", "country_gdp_trend_BB.png"}
+
+
+def test_pool_and_serial_paths_write_every_chart(tmp_path):
+    df = country_panel(["aa", "bb", "cc"])
+
+    for workers, name in [(1, "serial"), (2, "pool")]:
+        paths = plot_country_trends_batch(df, str(tmp_path / name), kind="gdp", max_workers=workers)
+        assert all(os.path.isfile(path) for path in paths)
+        assert len(paths) == 3
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_written_bytes_are_reported_to_the_stage(tmp_path, workers):
+    df = country_panel(["aa", "bb", "cc"])
+
+    with measure_stage("country_charts") as metrics:
+        paths = plot_country_trends_batch(df, str(tmp_path), kind="gdp", max_workers=workers)
+
+    assert metrics["bytes_written"] == sum(os.path.getsize(path) for path in paths) > 0
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from src.country_codes import UNRESOLVED_FILENAME, UNRESOLVED_PREVIEW, report_unresolved
+
+
+def test_log_lists_only_the_first_names_and_the_file_has_all(tmp_path, capsys):
+    lookup_path = tmp_path / "iso3_lookup.csv"
+    unresolved = [f"Region {i:03d}" for i in range(25)]
+
+    report_unresolved(unresolved, lookup_path=str(lookup_path))
+
+    output = capsys.readouterr().out
+    assert "(25)" in output
+    assert "Region 009" in output and "Region 010" not in output
+    assert f"({25 - UNRESOLVED_PREVIEW} more)" in output
+
+    saved = pd.read_csv(tmp_path / UNRESOLVED_FILENAME)
+    assert saved["Country"].tolist() == unresolved
+
+
+def test_stale_unresolved_list_is_removed(tmp_path):
+    lookup_path = tmp_path / "iso3_lookup.csv"
+
+    report_unresolved(["Atlantis"], lookup_path=str(lookup_path))
+    report_unresolved([], lookup_path=str(lookup_path))
+
+    assert not (tmp_path / UNRESOLVED_FILENAME).exists()
@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.economic_analysis import compute_country_trends
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTERMEDIATE_DATA = os.path.join(ROOT_DIR, "data", "intermediate", "intermediate_data.csv")
+
+
+def legacy_country_trends(input_path, recent_years=5):
+    """
+    The groupby / apply implementation compute_country_trends replaced,
+    without the CSV output. pct_change is called with fill_method=None
+    (the pandas 3 default; pandas 2.x pads missing GDP with a
+    FutureWarning), which is what the vectorized growth rate does.
+    """
+
+    df = pd.read_csv(input_path)
+    df["Year"] = pd.to_datetime(df["Year"])
+    df = df.sort_values(["Country_ID", "Year"])
+
+    country_names = (
+        df.groupby("Country_ID")["Country"]
+        .first()
+        .rename("Country")
+    )
+
+    df["GDP_growth_pct"] = (
+        df.groupby("Country_ID")["GDP"]
+        .pct_change(fill_method=None) * 100
+    )
+
+    mean_recent_growth = (
+        df.groupby("Country_ID")
+        .tail(recent_years)
+        .groupby("Country_ID")["GDP_growth_pct"]
+        .mean()
+        .rename("mean_gdp_growth_last_years")
+    )
+
+    gdp_volatility = (
+        df.groupby("Country_ID")["GDP"]
+        .std()
+        .rename("gdp_volatility_std")
+    )
+
+    inflation_mean = (
+        df.groupby("Country_ID")["Inflation_CPI"]
+        .mean()
+        .rename("mean_inflation")
+    )
+
+    inflation_trend_value = (
+        df.groupby("Country_ID")["Inflation_CPI"]
+        .apply(lambda x: x.iloc[-1] - x.iloc[0])
+    )
+
+    inflation_trend_direction = (
+        inflation_trend_value
+        .apply(lambda x: "Upward" if x > 0 else "Downward")
+        .rename("inflation_trend_direction")
+    )
+
+    crisis_year_count = (
+        df[df["GDP_growth_pct"] < 0]
+        .groupby("Country_ID")
+        .size()
+        .rename("crisis_year_count")
+    )
+
+    return pd.concat(
+        [
+            country_names,
+            mean_recent_growth,
+            gdp_volatility,
+            inflation_mean,
+            inflation_trend_direction,
+            crisis_year_count,
+        ],
+        axis=1
+    ).reset_index(drop=True)
+
+
+def assert_same_trends(input_path, recent_years=5):
+    expected = legacy_country_trends(input_path, recent_years=recent_years)
+    result = compute_country_trends(input_path, None, recent_years=recent_years)
+
+    result = result.astype({"Country": str})
+    expected = expected.astype({"Country": str, "crisis_year_count": float})
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
+
+
+@pytest.fixture
+def toy_panel_csv(tmp_path):
+    """
+    Small panel without GDP_growth_pct (growth is recomputed from GDP):
+    - "aa": regular country with a crisis year
+    - "bb": missing GDP inside the series
+    - "cc": GDP missing in every year
+    - "dd", "ee": single-row countries
+    """
+
+    rows = [
+        ("aa", "Alpha", 2000, 100.0, 2.0),
+        ("aa", "Alpha", 2001, 110.0, 3.0),
+        ("aa", "Alpha", 2002, 99.0, 1.5),
+        ("aa", "Alpha", 2003, 120.0, 4.0),
+        ("bb", "Beta", 2000, 50.0, 10.0),
+        ("bb", "Beta", 2001, np.nan, 12.0),
+        ("bb", "Beta", 2002, 45.0, 9.0),
+        ("bb", "Beta", 2003, 47.0, np.nan),
+        ("cc", "Gamma", 2001, np.nan, 5.0),
+        ("cc", "Gamma", 2002, np.nan, 6.0),
+        ("dd", "Delta", 2010, 80.0, 1.0),
+        ("ee", "Epsilon", 1999, np.nan, np.nan),
+    ]
+    df = pd.DataFrame(rows, columns=["Country_ID", "Country", "Year", "GDP", "Inflation_CPI"])
+
+    # rows out of (Country_ID, Year) order
+    df = df.sample(frac=1, random_state=0)
+
+    path = tmp_path / "toy_panel.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_matches_legacy_on_intermediate_data():
+    assert_same_trends(INTERMEDIATE_DATA)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_matches_legacy_on_shuffled_rows(tmp_path, seed):
+    df = pd.read_csv(INTERMEDIATE_DATA).sample(frac=1, random_state=seed)
+
+    path = tmp_path / "shuffled.csv"
+    df.to_csv(path, index=False)
+
+    assert_same_trends(str(path))
+
+
+@pytest.mark.parametrize("recent_years", [1, 3, 5])
+def test_matches_legacy_with_missing_gdp_and_single_rows(toy_panel_csv, recent_years):
+    assert_same_trends(toy_panel_csv, recent_years=recent_years)
+
+
+def test_single_row_countries(toy_panel_csv):
+    result = compute_country_trends(toy_panel_csv, None).set_index("Country")
+
+    for country in ["Delta", "Epsilon"]:
+        row = result.loc[country]
+        assert np.isnan(row["mean_gdp_growth_last_years"])
+        assert np.isnan(row["gdp_volatility_std"])
+        assert np.isnan(row["crisis_year_count"])
+        assert row["inflation_trend_direction"] == "Downward"
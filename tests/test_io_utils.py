@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import io_utils
+from src.io_utils import iter_frames, read_csv
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DATA = os.path.join(ROOT_DIR, "data", "raw", "dataset.csv")
+INTERMEDIATE_DATA = os.path.join(ROOT_DIR, "data", "intermediate", "intermediate_data.csv")
+
+ENGINES = ["c"] + (["pyarrow"] if io_utils.CSV_ENGINE == "pyarrow" else [])
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request, monkeypatch):
+    """
+    Forces read_csv to use one parser for every file size.
+    """
+
+    monkeypatch.setattr(io_utils, "CSV_ENGINE", request.param)
+    monkeypatch.setattr(io_utils, "PYARROW_MIN_BYTES", 0)
+    return request.param
+
+
+@pytest.mark.parametrize("columns", [
+    None,
+    ["Country_ID", "Year", "GDP"],
+    ["Country_ID", "Year", "GDP", "not_in_file"],
+])
+def test_engines_read_the_same_frame(engine, columns):
+    expected = pd.read_csv(INTERMEDIATE_DATA, engine="c", dtype=io_utils.csv_dtypes(columns))
+    if columns is not None:
+        expected = expected[[col for col in columns if col in expected.columns]]
+
+    pd.testing.assert_frame_equal(read_csv(INTERMEDIATE_DATA, columns=columns), expected)
+
+
+@pytest.mark.parametrize("path", [RAW_DATA, INTERMEDIATE_DATA])
+def test_no_requested_column_in_file_gives_empty_frame(engine, path):
+    df = read_csv(path, columns=["not_in_file"])
+
+    assert df.empty
+    assert list(df.columns) == []
+
+
+def test_chunked_read_skips_columns_missing_from_the_file():
+    columns = ["Country_ID", "Year", "GDP", "not_in_file"]
+
+    chunks = list(iter_frames(INTERMEDIATE_DATA, columns=columns, chunksize=500))
+
+    assert len(chunks) > 1
+    # chunk categories differ, so the concatenated Country_ID is not categorical
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True),
+        read_csv(INTERMEDIATE_DATA, columns=columns),
+        check_dtype=False,
+        check_categorical=False
+    )
+
+
+def test_chunked_read_of_no_present_column_gives_empty_frame():
+    chunks = list(iter_frames(INTERMEDIATE_DATA, columns=["not_in_file"], chunksize=500))
+
+    assert len(chunks) == 1
+    assert chunks[0].empty
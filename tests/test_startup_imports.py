@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup_imports import copy_pipeline
+
+
+PLOTTING_PACKAGES = ["matplotlib", "plotly", "seaborn"]
+
+# prints the plotting modules loaded by the time `code` has run
+CHECK_SCRIPT = """
+import json, sys
+{code}
+print(json.dumps(sorted(
+    name for name in sys.modules if name.split(".")[0] in {packages!r}
+)))
+"""
+
+
+@pytest.fixture
+def pipeline_copy(tmp_path):
+    """
+    main.py, src/ and the raw / reference data in a temporary directory,
+    so commands write their outputs there instead of the repository.
+    """
+
+    copy_pipeline(str(tmp_path))
+    return tmp_path
+
+
+def loaded_plotting_modules(cwd, code):
+    process = subprocess.run(
+        [sys.executable, "-c", CHECK_SCRIPT.format(code=code, packages=PLOTTING_PACKAGES)],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    assert process.returncode == 0, process.stderr[-2000:]
+
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def test_import_main_loads_no_plotting_library(pipeline_copy):
+    assert loaded_plotting_modules(pipeline_copy, "import main; main.build_stages()") == []
+
+
+@pytest.mark.parametrize("command", ["prepare", "analyze"])
+def test_analytics_command_loads_no_plotting_library(pipeline_copy, command):
+    code = f"import main; main.main([{command!r}])"
+
+    assert loaded_plotting_modules(pipeline_copy, code) == []
+    assert (pipeline_copy / "data" / "cleaned" / "cleaned_data.csv").exists()
+    if command == "analyze":
+        assert (pipeline_copy / "outputs" / "csv" / "country_trends.csv").exists()
@@ -0,0 +1,13 @@
+import pytest
+
+from benchmarks.run_benchmarks import SIZES
+from src.data_preparation import _standardize
+from src.synthetic import generate_raw_panel
+
+
+@pytest.mark.parametrize("n_years", sorted({n_years for _, n_years in SIZES.values()}))
+def test_every_generated_year_survives_cleaning(n_years):
+    raw = generate_raw_panel(n_entities=3, n_years=n_years)
+
+    assert raw["year"].nunique() == n_years
+    assert len(_standardize(raw.copy())) == len(raw)